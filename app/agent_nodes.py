@@ -1,15 +1,17 @@
-import re
 from app.observability import trace_event
 from langgraph.types import interrupt
 
 from app.agent_logger import log_step
 
+from app.canonicalize import extract_order_ids
+from app.intent_schema import IntentLabel
 from app.llm_multi_intent_classifier import classify_multi_intent
 from app.intent_classifier import classify_intent
 from app.intent import Intent
 from app.rag.rag_answer import answer_question
 from app.tools.order_lookup import lookup_order
 from app.llm import get_llm
+from app.sentiment import score_sentiment
 
 
 
@@ -18,8 +20,23 @@ def analyze_node(state):
 
     query = state["query"]
 
-    multi_intent = classify_multi_intent(query)
+    # Angry customers go straight to a human, no classification needed
+    sentiment = score_sentiment(query)
+    if sentiment.escalate:
+        trace_event(
+            event_type="sentiment_escalation",
+            data={"query": query, "score": sentiment.score, "cues": list(sentiment.cues)},
+            thread_id=state.get("thread_id", "default"),
+        )
+        return {
+            **state,
+            "intents": [],
+            "intent": IntentLabel.OTHER,
+            "intent_reason": f"Escalated on sentiment ({', '.join(sentiment.cues)})",
+            "escalate": True,
+        }
 
+    multi_intent = classify_multi_intent(query)
 
 
     return {
@@ -55,8 +72,8 @@ def policy_node(state):
 
 def order_node(state):
     log_step("order", state)
-    match = re.search(r"(ORD\d+)", state["query"])
-    order_id = match.group(1) if match else None
+    order_ids = extract_order_ids(state["query"])
+    order_id = order_ids[0] if order_ids else None
 
     if not order_id:
         response = "Please provide your order ID."
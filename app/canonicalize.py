@@ -0,0 +1,66 @@
+import re
+import unicodedata
+from dataclasses import dataclass
+
+# Order ids are masked so that "Where is ORD123" and "where is ord456?"
+# classify, embed and cache identically; the ids are kept on the side.
+ORDER_ID_RE = re.compile(r"\bORD[-_]?(\d+)\b", re.I)
+ORDER_ID_PLACEHOLDER = "<order_id>"
+
+# NFKC leaves typographic quotes and dashes alone
+_PUNCT_MAP = str.maketrans({
+    "‘": "'", "’": "'", "‚": "'", "‛": "'",
+    "“": '"', "”": '"', "„": '"', "‟": '"',
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-", "―": "-",
+    "…": "...",
+})
+_CONTROL_RE = re.compile(r"[\u0000-\u001f\u007f]")
+_ZERO_WIDTH_RE = re.compile(r"[\u200b-\u200d\u2060\ufeff]")
+_REPEATED_PUNCT_RE = re.compile(r"([!?.,])\1+")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([!?.,;:])")
+_TRAILING_PUNCT_RE = re.compile(r"[\s!?.,;:]+$")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class CanonicalQuery:
+    text: str
+    original: str
+    order_ids: tuple[str, ...] = ()
+
+    @property
+    def order_id(self) -> str | None:
+        return self.order_ids[0] if self.order_ids else None
+
+
+def extract_order_ids(text: str) -> tuple[str, ...]:
+    """Order ids in the form lookup_order expects (ORD123), in order of appearance."""
+    seen = dict.fromkeys(f"ORD{m.group(1)}" for m in ORDER_ID_RE.finditer(text))
+    return tuple(seen)
+
+
+def canonicalize(query: str) -> CanonicalQuery:
+    """
+    Canonical form of a user query, used as classifier input, embedding input
+    and therefore cache key: Unicode NFKC, casefolded, punctuation and
+    whitespace normalised, order ids replaced by ORDER_ID_PLACEHOLDER.
+
+    Idempotent, so it is safe to apply at every layer that needs it.
+    """
+    text = unicodedata.normalize("NFKC", query).translate(_PUNCT_MAP)
+    text = _ZERO_WIDTH_RE.sub("", _CONTROL_RE.sub(" ", text))
+
+    order_ids = extract_order_ids(text)
+    text = ORDER_ID_RE.sub(f" {ORDER_ID_PLACEHOLDER} ", text)
+
+    text = text.casefold()
+    text = _WHITESPACE_RE.sub(" ", text)
+    text = _REPEATED_PUNCT_RE.sub(r"\1", text)
+    text = _SPACE_BEFORE_PUNCT_RE.sub(r"\1", text)
+    text = _TRAILING_PUNCT_RE.sub("", text).strip()
+
+    return CanonicalQuery(text=text, original=query, order_ids=order_ids)
+
+
+def canonical_text(query: str) -> str:
+    return canonicalize(query).text
@@ -0,0 +1,142 @@
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from array import array
+from pathlib import Path
+
+from app.config import LLM_CASSETTE_MODE, LLM_CASSETTE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+def request_key(kind: str, **request) -> str:
+    payload = json.dumps({"kind": kind, **request}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _encode(kind: str, value):
+    # embeddings are stored as base64 float32, which is ~4x smaller than JSON floats
+    if kind == "embed":
+        return base64.b64encode(array("f", value).tobytes()).decode("ascii")
+    return value
+
+
+def _decode(kind: str, value):
+    if kind == "embed":
+        vec = array("f")
+        vec.frombytes(base64.b64decode(value))
+        return vec.tolist()
+    return value
+
+
+class Cassette:
+    """
+    Request/response recorder for the Ollama transport.
+
+    record: every chat / embedding result is appended to a gzip'd JSONL file
+            (one line per distinct request; re-recording skips known keys)
+    replay: results are served from the file without touching Ollama; a
+            request that is not on the cassette raises CassetteMiss and is
+            counted in the miss report
+    """
+
+    def __init__(self, path: str = LLM_CASSETTE_PATH, mode: str = LLM_CASSETTE_MODE):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode!r}")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.missed_requests: list[str] = []
+
+        self._entries: dict[str, tuple[str, object]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self):
+        if not self.path.exists():
+            if self.replaying:
+                logger.warning("Cassette %s does not exist; every request will miss", self.path)
+            return
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    rec = json.loads(line)
+                    self._entries[rec["k"]] = (rec["t"], rec["v"])
+        logger.info("Loaded %d cassette entries from %s", len(self._entries), self.path)
+
+    def play(self, key: str, description: str = ""):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                self.missed_requests.append(description or key)
+                raise CassetteMiss(f"Not on cassette {self.path}: {description or key}")
+            self.hits += 1
+        kind, value = entry
+        return _decode(kind, value)
+
+    def record(self, key: str, kind: str, value):
+        if self.replaying or not value:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            encoded = _encode(kind, value)
+            self._entries[key] = (kind, encoded)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # each append adds a gzip member; gzip.open reads them back as one stream
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(json.dumps({"k": key, "t": kind, "v": encoded}) + "\n")
+            self.recorded += 1
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
+
+    def report(self):
+        if self.replaying:
+            logger.warning(
+                "Cassette replay: %d hits, %d misses%s",
+                self.hits,
+                self.misses,
+                "".join(f"\n  miss: {m}" for m in self.missed_requests[:20]),
+            )
+        else:
+            logger.warning("Cassette record: %d new entries written to %s", self.recorded, self.path)
+
+
+_CASSETTE = None
+_CASSETTE_LOCK = threading.Lock()
+
+
+def get_cassette() -> Cassette | None:
+    """Process-wide cassette, or None when LLM_CASSETTE_MODE is off."""
+    global _CASSETTE
+    if LLM_CASSETTE_MODE == "off":
+        return None
+    if _CASSETTE is None:
+        with _CASSETTE_LOCK:
+            if _CASSETTE is None:
+                _CASSETTE = Cassette()
+                atexit.register(_CASSETTE.report)
+    return _CASSETTE
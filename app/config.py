@@ -3,9 +3,147 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _keep_alive(value: str):
+    # Ollama takes keep_alive as a duration string ("30m") or a number of
+    # seconds, where a negative number keeps the model loaded indefinitely.
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1")
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+# OLLAMA_BASE_URL may be a comma-separated list of hosts; calls are balanced
+# across all of them and OLLAMA_BASE_URL itself resolves to the first one.
+OLLAMA_HOSTS = [
+    h.strip()
+    for h in os.getenv("OLLAMA_BASE_URL", "http://localhost:11434").split(",")
+    if h.strip()
+]
+OLLAMA_BASE_URL = OLLAMA_HOSTS[0]
 TEMPERATURE = float(os.getenv("TEMPERATURE", 0.2))
 ESCALATION_SENTIMENT = os.getenv("ESCALATION_SENTIMENT", "angry")
+# anger score (0-1) from app/sentiment.py at which a message counts as "angry"
+SENTIMENT_ANGER_THRESHOLD = float(os.getenv("SENTIMENT_ANGER_THRESHOLD", 0.8))
+
+# Shared Ollama HTTP client (one keep-alive connection pool per host)
+OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", 16))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", 120))
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", 5))
+OLLAMA_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", 60))
+
+# LLM response cache (in-process LRU backed by SQLite)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.db")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 86400))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 50000))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", 1024))
+
+# Embedding cache: in-process LRU of float32 vectors, optionally backed by
+# SQLite (EMBED_CACHE_PATH="" keeps it memory-only)
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "data/embed_cache.db")
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", 100000))
+EMBED_CACHE_MEMORY_ENTRIES = int(os.getenv("EMBED_CACHE_MEMORY_ENTRIES", 4096))
+
+# Inference scheduler in front of Ollama (limit is across all hosts, 0 = unbounded queue)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4 * len(OLLAMA_HOSTS)))
+LLM_MAX_QUEUE_DEPTH = int(os.getenv("LLM_MAX_QUEUE_DEPTH", 0))
+
+# Multi-host balancing: background health probes and hedged requests
+# (OLLAMA_HEDGE_AFTER is in seconds, 0 disables hedging). A hedge and the
+# request it duplicates both run until they finish, so up to
+# OLLAMA_MAX_HEDGES requests may run beyond LLM_MAX_CONCURRENCY
+OLLAMA_HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", 10))
+OLLAMA_HEDGE_AFTER = float(os.getenv("OLLAMA_HEDGE_AFTER", 0))
+OLLAMA_MAX_HEDGES = int(os.getenv("OLLAMA_MAX_HEDGES", 2))
+
+# Intent classifiers: ask Ollama for schema-constrained JSON, cap the output
+# and stop streaming as soon as the JSON object is closed
+CLASSIFIER_STRUCTURED_OUTPUT = os.getenv("CLASSIFIER_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+CLASSIFIER_NUM_PREDICT = int(os.getenv("CLASSIFIER_NUM_PREDICT", 128))
+
+# Inference profiles (see app/inference_profiles.py). Every model defaults to
+# OLLAMA_MODEL; point CLASSIFIER_MODEL at a small model to make classification
+# cheap. EMBED_MODEL must match the model the policy index was ingested with.
+# keep_alive defaults to -1 so the models stay resident once warmed up.
+CLASSIFIER_MODEL = os.getenv("CLASSIFIER_MODEL", OLLAMA_MODEL)
+CLASSIFIER_NUM_CTX = int(os.getenv("CLASSIFIER_NUM_CTX", 2048))
+CLASSIFIER_KEEP_ALIVE = _keep_alive(os.getenv("CLASSIFIER_KEEP_ALIVE", "-1"))
+
+ANSWER_MODEL = os.getenv("ANSWER_MODEL", OLLAMA_MODEL)
+ANSWER_NUM_CTX = int(os.getenv("ANSWER_NUM_CTX", 4096))
+ANSWER_NUM_PREDICT = int(os.getenv("ANSWER_NUM_PREDICT", 384))
+ANSWER_KEEP_ALIVE = _keep_alive(os.getenv("ANSWER_KEEP_ALIVE", "-1"))
+
+EMBED_MODEL = os.getenv("EMBED_MODEL", OLLAMA_MODEL)
+EMBED_NUM_CTX = int(os.getenv("EMBED_NUM_CTX", 2048))
+EMBED_KEEP_ALIVE = _keep_alive(os.getenv("EMBED_KEEP_ALIVE", "-1"))
+
+# Startup warmup: preload models, run one classification and one retrieval
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", 10))
+
+# Record/replay of LLM + embedding calls: "off", "record" or "replay"
+LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", "off").lower()
+LLM_CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", "data/cassettes/llm.jsonl.gz")
+
+# Local (non-LLM) fast-path intent classifier; the LLM classifier only runs
+# when the local confidence is below the threshold
+INTENT_EXAMPLES_PATH = os.getenv("INTENT_EXAMPLES_PATH", "data/intent_examples.jsonl")
+LOCAL_CLASSIFIER_ENABLED = os.getenv("LOCAL_CLASSIFIER_ENABLED", "true").lower() in ("1", "true", "yes")
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", 0.85))
+
+# Classifier used when the local fast path is not confident: "llm", or
+# "embedding" (nearest intent centroid, falling back to the LLM below
+# EMBEDDING_CLASSIFIER_THRESHOLD)
+INTENT_CLASSIFIER_BACKEND = os.getenv("INTENT_CLASSIFIER_BACKEND", "llm").lower()
+INTENT_CENTROIDS_PATH = os.getenv("INTENT_CENTROIDS_PATH", "data/intent_centroids.npz")
+EMBEDDING_CLASSIFIER_THRESHOLD = float(os.getenv("EMBEDDING_CLASSIFIER_THRESHOLD", 0.6))
+
+# Dynamic few-shot selection for the LLM classifiers: send only the k most
+# similar labelled examples (0 = send the full EXAMPLES block). Costs one
+# query embedding per classification (shared with retrieval when it runs);
+# the example pool is embedded once, at warmup or in the background, and
+# the full EXAMPLES block is sent until that is done
+FEWSHOT_K = int(os.getenv("FEWSHOT_K", 4))
+FEWSHOT_INDEX_DIR = os.getenv("FEWSHOT_INDEX_DIR", "data/fewshot")
+
+# Batch intent classification (many queries per LLM call)
+CLASSIFIER_BATCH_MAX_SIZE = int(os.getenv("CLASSIFIER_BATCH_MAX_SIZE", 32))
+CLASSIFIER_BATCH_OUTPUT_TOKENS = int(os.getenv("CLASSIFIER_BATCH_OUTPUT_TOKENS", 48))
+
+# Speculative retrieval: start embedding + vector search in route_query
+# while the intent is still being classified
+SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "true").lower() in ("1", "true", "yes")
+SPECULATIVE_RETRIEVAL_WORKERS = int(os.getenv("SPECULATIVE_RETRIEVAL_WORKERS", 8))
+
+# Intent classifier strategies (app/intent_strategies.py): the production
+# strategy answers; shadow strategies run off-thread on a sample of traffic
+# and are compared against it in the traces
+INTENT_STRATEGY = os.getenv("INTENT_STRATEGY", "cascade")
+INTENT_SHADOW_STRATEGIES = [s.strip() for s in os.getenv("INTENT_SHADOW_STRATEGIES", "").split(",") if s.strip()]
+INTENT_SHADOW_SAMPLE_RATE = float(os.getenv("INTENT_SHADOW_SAMPLE_RATE", 0.05))
+INTENT_SHADOW_WORKERS = int(os.getenv("INTENT_SHADOW_WORKERS", 2))
 
+# Micro-batching of retrieval: query embeddings and Chroma searches from
+# concurrent requests are collected for up to RETRIEVAL_BATCH_WAIT_MS and
+# sent as one call (0 = no batching)
+RETRIEVAL_BATCH_WAIT_MS = float(os.getenv("RETRIEVAL_BATCH_WAIT_MS", 5))
+RETRIEVAL_BATCH_MAX = int(os.getenv("RETRIEVAL_BATCH_MAX", 32))
+RETRIEVAL_BATCH_CONCURRENCY = int(os.getenv("RETRIEVAL_BATCH_CONCURRENCY", 2))
 
+# Vector store backend: "chroma", "numpy" (memory-mapped exact search in
+# app/rag/vector_store.py), or "auto" (chroma when installed)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "auto").lower()
+VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", "data/vectors")
+# NumPy store only: scan an int8 (per-vector scale) or float16 copy of the
+# embeddings and rescore the best k * VECTOR_RESCORE_FACTOR exactly
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none").lower()
+VECTOR_RESCORE_FACTOR = int(os.getenv("VECTOR_RESCORE_FACTOR", 4))
+# Reduce embeddings at ingest: "pca" (fitted on the corpus) or "truncate"
+# (first N dims, for Matryoshka-style models) down to VECTOR_PROJECTION_DIM;
+# "none" stores full vectors. Re-ingest into an empty store after changing.
+VECTOR_PROJECTION = os.getenv("VECTOR_PROJECTION", "none").lower()
+VECTOR_PROJECTION_DIM = int(os.getenv("VECTOR_PROJECTION_DIM", 256))
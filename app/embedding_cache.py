@@ -0,0 +1,74 @@
+import hashlib
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+from app.config import (
+    EMBED_CACHE_ENABLED,
+    EMBED_CACHE_PATH,
+    EMBED_CACHE_MAX_ENTRIES,
+    EMBED_CACHE_MEMORY_ENTRIES,
+)
+from app.sqlite_lru import SQLiteLRUCache
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def make_embedding_key(model: str, text: str) -> str:
+    """
+    Key for an embedding: model + text with Unicode and whitespace
+    normalised. Queries are already canonicalized by the callers (see
+    app/canonicalize.py); documents keep their case and punctuation.
+    """
+    text = _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _encode_vector(embedding) -> bytes:
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def _decode_vector(blob: bytes) -> list[float]:
+    return np.frombuffer(blob, dtype=np.float32).tolist()
+
+
+class EmbeddingCache(SQLiteLRUCache):
+    """
+    Embedding cache (see app/sqlite_lru.py); vectors are stored as raw
+    float32 blobs. Embeddings are deterministic for a model, so entries
+    never expire. db_path=None keeps the cache in memory only.
+    """
+
+    def __init__(
+        self,
+        db_path: str | None = EMBED_CACHE_PATH,
+        max_entries: int = EMBED_CACHE_MAX_ENTRIES,
+        memory_entries: int = EMBED_CACHE_MEMORY_ENTRIES,
+    ):
+        super().__init__(
+            "embedding_cache",
+            db_path,
+            ttl=0,
+            max_entries=max_entries,
+            memory_entries=memory_entries,
+            encode=_encode_vector,
+            decode=_decode_vector,
+        )
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Process-wide embedding cache, or None when EMBED_CACHE_ENABLED is off."""
+    global _CACHE
+    if not EMBED_CACHE_ENABLED:
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = EmbeddingCache()
+    return _CACHE
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from app.canonicalize import canonical_text
+from app.config import INTENT_CENTROIDS_PATH
+from app.inference_profiles import get_profile
+from app.inference_scheduler import Priority
+from app.intent_schema import IntentResult, IntentLabel
+from app.llm import embed
+from app.llm_intent_classifier import EXAMPLES
+from app.local_intent_classifier import load_labelled_examples
+
+logger = logging.getLogger(__name__)
+
+# softmax temperature over cosine similarities; cosine gaps between intents
+# are small, so this has to be sharp to give usable confidences
+SOFTMAX_TEMPERATURE = 0.05
+
+_EXAMPLE_RE = re.compile(r'User:\s*"(.*?)"\s*Output:\s*\{.*?"intent":\s*"(\w+)"', re.S)
+
+
+def exemplars() -> list[tuple[str, IntentLabel]]:
+    """Few-shot EXAMPLES plus the labelled example file, de-duplicated."""
+    pairs = [(q, IntentLabel(label)) for q, label in _EXAMPLE_RE.findall(EXAMPLES)]
+    pairs += load_labelled_examples()
+    # embedded the same way as incoming queries
+    pairs = [(canonical_text(q), label) for q, label in pairs]
+
+    seen = set()
+    unique = []
+    for text, label in pairs:
+        if text not in seen:
+            seen.add(text)
+            unique.append((text, label))
+    return unique
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    return m / np.where(norms == 0, 1.0, norms)
+
+
+class CentroidIntentClassifier:
+    """
+    Nearest-centroid classifier in embedding space: one unit-length
+    centroid per IntentLabel, scored with a single matrix-vector product.
+    """
+
+    def __init__(self, labels: list[IntentLabel], centroids: np.ndarray):
+        self.labels = labels
+        self.centroids = _normalize(centroids.astype(np.float32))
+
+    @classmethod
+    def fit(cls, examples: list[tuple[str, IntentLabel]], embed_fn=embed):
+        vectors = np.asarray([embed_fn(text) for text, _ in examples], dtype=np.float32)
+        vectors = _normalize(vectors)
+        labels = sorted({label for _, label in examples}, key=lambda l: l.value)
+        targets = np.asarray([labels.index(label) for _, label in examples])
+        centroids = np.stack([vectors[targets == i].mean(axis=0) for i in range(len(labels))])
+        return cls(labels, centroids)
+
+    def classify(self, embedding) -> IntentResult:
+        q = _normalize(np.asarray(embedding, dtype=np.float32))
+        sims = self.centroids @ q
+
+        z = (sims - sims.max()) / SOFTMAX_TEMPERATURE
+        probs = np.exp(z) / np.exp(z).sum()
+        best = int(probs.argmax())
+
+        return IntentResult(
+            intent=self.labels[best],
+            confidence=round(float(probs[best]), 3),
+            reason=f"Nearest intent centroid (cosine={sims[best]:.3f})",
+        )
+
+    def save(self, path: str, fingerprint: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            centroids=self.centroids,
+            labels=np.asarray([l.value for l in self.labels]),
+            fingerprint=np.asarray(fingerprint),
+        )
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str):
+        p = Path(path)
+        if not p.exists():
+            return None
+        data = np.load(p)
+        if str(data["fingerprint"]) != fingerprint:
+            return None
+        return cls([IntentLabel(l) for l in data["labels"]], data["centroids"])
+
+
+def _fingerprint(examples: list[tuple[str, IntentLabel]]) -> str:
+    # centroids depend on the embedding model and the exact exemplar set
+    payload = json.dumps([get_profile("embed").model, [(t, l.value) for t, l in examples]])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_CLASSIFIER = None
+_CLASSIFIER_LOCK = threading.Lock()
+
+
+def get_centroid_classifier() -> CentroidIntentClassifier:
+    """
+    Load the centroid matrix from INTENT_CENTROIDS_PATH, or embed the
+    exemplars and build it when the file is missing or stale.
+    """
+    global _CLASSIFIER
+    if _CLASSIFIER is None:
+        with _CLASSIFIER_LOCK:
+            if _CLASSIFIER is None:
+                examples = exemplars()
+                fingerprint = _fingerprint(examples)
+                clf = CentroidIntentClassifier.load(INTENT_CENTROIDS_PATH, fingerprint)
+                if clf is None:
+                    logger.info("Building intent centroids from %d exemplars", len(examples))
+                    clf = CentroidIntentClassifier.fit(
+                        examples,
+                        embed_fn=lambda text: embed(text, priority=Priority.BULK),
+                    )
+                    clf.save(INTENT_CENTROIDS_PATH, fingerprint)
+                _CLASSIFIER = clf
+    return _CLASSIFIER
+
+
+def classify_intent_embedding(query: str, embedding=None, priority: Priority = Priority.INTERACTIVE) -> IntentResult:
+    """
+    Classify by embedding similarity. Pass `embedding` when the query has
+    already been embedded (e.g. for retrieval) to skip the embed call.
+    """
+    if embedding is None:
+        embedding = embed(query, priority=priority)
+    return get_centroid_classifier().classify(embedding)
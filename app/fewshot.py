@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from app.canonicalize import canonical_text
+from app.config import FEWSHOT_K, FEWSHOT_INDEX_DIR
+from app.inference_profiles import get_profile
+from app.inference_scheduler import Priority
+from app.llm import embed
+from app.local_intent_classifier import load_labelled_examples
+
+logger = logging.getLogger(__name__)
+
+# reasons used when rendering rows of the labelled example file as outputs
+LABEL_REASONS = {
+    "POLICY": "Asks about returns, policies or eligibility",
+    "ORDER_STATUS": "Asks for order status/tracking",
+    "REFUND": "Explicit refund or money-back request",
+    "OTHER": "Greeting, complaint or unrelated message",
+}
+
+_BLOCK_RE = re.compile(r'User:\s*"(.*?)"\s*Output:\s*(\{.*\})', re.S)
+
+
+def parse_examples(text: str) -> list[tuple[str, str]]:
+    """Split an EXAMPLES string into (user query, output JSON) pairs."""
+    pairs = []
+    for block in re.split(r"\n\s*\n", text.strip()):
+        m = _BLOCK_RE.search(block)
+        if m:
+            pairs.append((m.group(1), m.group(2).strip()))
+    return pairs
+
+
+def render_example(query: str, output: str) -> str:
+    return f'User: "{query}"\nOutput:\n{output}'
+
+
+class FewShotSelector:
+    """
+    Pool of labelled few-shot examples indexed by embedding. Each query gets
+    only the k most similar examples instead of the whole pool.
+
+    The pool is the hand-written EXAMPLES blocks plus every row of the
+    labelled example file, rendered with `make_output(label)`.
+    """
+
+    def __init__(self, name: str, examples_text: str, make_output: Callable[[str], dict], k: int = FEWSHOT_K):
+        self.name = name
+        self.examples_text = examples_text
+        self.make_output = make_output
+        self.k = k
+
+        self._pool: list[tuple[str, str]] | None = None
+        self._matrix: np.ndarray | None = None
+        self._lock = threading.Lock()
+        self._build_started = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.k > 0
+
+    def pool(self) -> list[tuple[str, str]]:
+        if self._pool is None:
+            pool = parse_examples(self.examples_text)
+            seen = {q.lower() for q, _ in pool}
+            for query, label in load_labelled_examples():
+                if query.lower() not in seen:
+                    seen.add(query.lower())
+                    pool.append((query, json.dumps(self.make_output(label.value))))
+            self._pool = pool
+        return self._pool
+
+    def _index_path(self) -> Path:
+        return Path(FEWSHOT_INDEX_DIR) / f"{self.name}.npz"
+
+    def _fingerprint(self, pool) -> str:
+        payload = json.dumps([get_profile("embed").model, [canonical_text(q) for q, _ in pool]])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def matrix(self) -> np.ndarray:
+        """Unit-normalised pool embeddings, loaded from disk when up to date."""
+        if self._matrix is None:
+            with self._lock:
+                if self._matrix is None:
+                    pool = self.pool()
+                    fingerprint = self._fingerprint(pool)
+                    path = self._index_path()
+
+                    if path.exists():
+                        data = np.load(path)
+                        if str(data["fingerprint"]) == fingerprint:
+                            self._matrix = data["matrix"]
+
+                    if self._matrix is None:
+                        logger.info("Embedding %d few-shot examples for %s", len(pool), self.name)
+                        m = np.asarray([embed(canonical_text(q), priority=Priority.BULK) for q, _ in pool], dtype=np.float32)
+                        m /= np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        np.savez(path, matrix=m, fingerprint=np.asarray(fingerprint))
+                        self._matrix = m
+        return self._matrix
+
+    def _build_in_background(self):
+        with self._lock:
+            if self._build_started:
+                return
+            self._build_started = True
+
+        def _build():
+            try:
+                self.matrix()
+            except Exception:
+                logger.exception("Embedding the few-shot pool for %s failed", self.name)
+                with self._lock:
+                    self._build_started = False
+
+        threading.Thread(target=_build, name=f"fewshot-{self.name}", daemon=True).start()
+
+    def select(self, query: str, embed_query=None, priority: Priority = Priority.INTERACTIVE) -> str | None:
+        """
+        The k nearest examples rendered like EXAMPLES (most similar last, next
+        to the user turn), or None if selection is off or failed, in which case
+        the caller should send the full EXAMPLES. priority is the caller's, used
+        when the query has to be embedded here. Until the pool is embedded
+        (normally at warmup) this returns None and starts embedding it in the
+        background, so a cold request never waits for the whole pool.
+        """
+        if not self.enabled:
+            return None
+        if self._matrix is None:
+            self._build_in_background()
+            return None
+        try:
+            q = np.asarray(embed_query() if embed_query else embed(canonical_text(query), priority=priority), dtype=np.float32)
+            sims = self.matrix() @ (q / max(float(np.linalg.norm(q)), 1e-12))
+        except Exception:
+            logger.exception("Few-shot selection failed for %s, sending all examples", self.name)
+            return None
+
+        k = min(self.k, len(sims))
+        if k == 0:
+            return None
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(sims[top])]
+
+        pool = self.pool()
+        return "\n\n".join(render_example(*pool[i]) for i in top)
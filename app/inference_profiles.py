@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+
+from app.config import (
+    TEMPERATURE,
+    CLASSIFIER_MODEL,
+    CLASSIFIER_NUM_CTX,
+    CLASSIFIER_NUM_PREDICT,
+    CLASSIFIER_KEEP_ALIVE,
+    ANSWER_MODEL,
+    ANSWER_NUM_CTX,
+    ANSWER_NUM_PREDICT,
+    ANSWER_KEEP_ALIVE,
+    EMBED_MODEL,
+    EMBED_NUM_CTX,
+    EMBED_KEEP_ALIVE,
+)
+
+
+@dataclass(frozen=True)
+class InferenceProfile:
+    """Model and runtime settings a call site runs with."""
+    name: str
+    model: str
+    num_ctx: int | None = None
+    num_predict: int | None = None
+    keep_alive: str | int | None = None
+    temperature: float | None = None
+
+
+PROFILES = {
+    # intent classification: short prompt, short JSON answer
+    "classify": InferenceProfile(
+        name="classify",
+        model=CLASSIFIER_MODEL,
+        num_ctx=CLASSIFIER_NUM_CTX,
+        num_predict=CLASSIFIER_NUM_PREDICT,
+        keep_alive=CLASSIFIER_KEEP_ALIVE,
+        temperature=TEMPERATURE,
+    ),
+    # grounded RAG answers: room for retrieved context
+    "answer": InferenceProfile(
+        name="answer",
+        model=ANSWER_MODEL,
+        num_ctx=ANSWER_NUM_CTX,
+        num_predict=ANSWER_NUM_PREDICT,
+        keep_alive=ANSWER_KEEP_ALIVE,
+        temperature=TEMPERATURE,
+    ),
+    # query / chunk embeddings
+    "embed": InferenceProfile(
+        name="embed",
+        model=EMBED_MODEL,
+        num_ctx=EMBED_NUM_CTX,
+        keep_alive=EMBED_KEEP_ALIVE,
+    ),
+}
+
+
+def get_profile(name: str) -> InferenceProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown inference profile: {name!r}") from None
@@ -0,0 +1,101 @@
+import heapq
+import itertools
+import threading
+import time
+from enum import IntEnum
+from typing import Any, Callable
+
+from app.config import LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE_DEPTH
+
+
+class Priority(IntEnum):
+    """Lower value is served first."""
+    INTERACTIVE = 0   # intent classification, HITL resume, order-status turns
+    RETRIEVAL = 1     # query embeddings for RAG
+    GENERATION = 2    # long grounded answer generations
+    BULK = 3          # offline triage / evaluation jobs
+
+
+class InferenceQueueFull(RuntimeError):
+    pass
+
+
+class InferenceScheduler:
+    """
+    Bounded priority queue in front of the Ollama daemon.
+
+    At most `max_concurrency` calls run at once; waiting calls are admitted
+    by priority, then FIFO within a priority class.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, max_queue_depth: int = LLM_MAX_QUEUE_DEPTH):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue_depth = max_queue_depth
+
+        self._cond = threading.Condition()
+        self._queue: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._active = 0
+
+        self._peak_queue_depth = 0
+        self._rejected = 0
+        self._completed = {p.name: 0 for p in Priority}
+        self._wait_total = {p.name: 0.0 for p in Priority}
+
+    def run(self, fn: Callable[[], Any], priority: Priority = Priority.GENERATION) -> Any:
+        ticket = (int(priority), next(self._seq))
+        enqueued_at = time.perf_counter()
+
+        with self._cond:
+            if self.max_queue_depth and len(self._queue) >= self.max_queue_depth:
+                self._rejected += 1
+                raise InferenceQueueFull(
+                    f"Inference queue is full ({len(self._queue)} waiting)"
+                )
+
+            heapq.heappush(self._queue, ticket)
+            self._peak_queue_depth = max(self._peak_queue_depth, len(self._queue))
+
+            while self._active >= self.max_concurrency or self._queue[0] != ticket:
+                self._cond.wait()
+
+            heapq.heappop(self._queue)
+            self._active += 1
+            self._wait_total[priority.name] += time.perf_counter() - enqueued_at
+            # the next ticket in line may also fit in a free slot
+            self._cond.notify_all()
+
+        try:
+            return fn()
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._completed[priority.name] += 1
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            queued = {p.name: 0 for p in Priority}
+            for prio, _ in self._queue:
+                queued[Priority(prio).name] += 1
+
+            return {
+                "max_concurrency": self.max_concurrency,
+                "active": self._active,
+                "queue_depth": len(self._queue),
+                "queued_by_priority": queued,
+                "peak_queue_depth": self._peak_queue_depth,
+                "rejected": self._rejected,
+                "completed_by_priority": dict(self._completed),
+                "avg_wait_ms_by_priority": {
+                    name: (self._wait_total[name] / n * 1000) if n else 0.0
+                    for name, n in self._completed.items()
+                },
+            }
+
+
+_SCHEDULER = InferenceScheduler()
+
+
+def get_scheduler() -> InferenceScheduler:
+    return _SCHEDULER
@@ -1,5 +1,40 @@
+import logging
+
+from app.config import (
+    LOCAL_CLASSIFIER_ENABLED,
+    LOCAL_CLASSIFIER_THRESHOLD,
+    INTENT_CLASSIFIER_BACKEND,
+    EMBEDDING_CLASSIFIER_THRESHOLD,
+)
+from app.canonicalize import canonical_text
+from app.embedding_intent_classifier import classify_intent_embedding
+from app.inference_scheduler import Priority
 from app.llm_intent_classifier import classify_intent_llm
+from app.local_intent_classifier import classify_intent_local
+
+logger = logging.getLogger(__name__)
+
+
+def classify_intent(query: str, embed_query=None, priority: Priority = Priority.INTERACTIVE):
+    """
+    embed_query: optional zero-arg callable returning the query embedding,
+    so a caller that needs the embedding anyway (retrieval) can share it.
+    """
+    query = canonical_text(query)
+
+    # Cascade: the local classifier settles clear-cut queries, the LLM
+    # only sees the ones it is not confident about
+    if LOCAL_CLASSIFIER_ENABLED:
+        local = classify_intent_local(query)
+        if local.confidence >= LOCAL_CLASSIFIER_THRESHOLD:
+            return local
 
-def classify_intent(query: str):
-    return classify_intent_llm(query)
+    if INTENT_CLASSIFIER_BACKEND == "embedding":
+        try:
+            result = classify_intent_embedding(query, embed_query() if embed_query else None, priority=priority)
+            if result.confidence >= EMBEDDING_CLASSIFIER_THRESHOLD:
+                return result
+        except Exception:
+            logger.exception("Embedding intent classifier failed, using the LLM")
 
+    return classify_intent_llm(query, embed_query, priority=priority)
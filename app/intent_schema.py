@@ -18,4 +18,17 @@ class MultiIntentResult(BaseModel):
     intents: List[IntentResult]
     chosen_intent: IntentLabel
     reason: str
-    
\ No newline at end of file
+
+
+class MultiIntentOutput(BaseModel):
+    """Shape the multi-intent classifier asks the model to produce."""
+    intents: List[IntentResult]
+
+
+class BatchIntentItem(IntentResult):
+    id: int = Field(..., description="Number of the message being classified")
+
+
+class BatchIntentOutput(BaseModel):
+    """Shape the batch classifier asks the model to produce."""
+    results: List[BatchIntentItem]
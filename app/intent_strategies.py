@@ -0,0 +1,181 @@
+import functools
+import logging
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from app.canonicalize import canonical_text
+from app.config import (
+    INTENT_STRATEGY,
+    INTENT_SHADOW_STRATEGIES,
+    INTENT_SHADOW_SAMPLE_RATE,
+    INTENT_SHADOW_WORKERS,
+)
+from app.embedding_intent_classifier import classify_intent_embedding
+from app.inference_scheduler import Priority
+from app.intent_classifier import classify_intent
+from app.intent_schema import IntentResult
+from app.llm import embed, track_usage
+from app.llm_intent_classifier import classify_intent_llm
+from app.local_intent_classifier import classify_intent_local
+from app.observability import trace_event
+
+logger = logging.getLogger(__name__)
+
+# A strategy takes (query, embed_query, priority) and returns an IntentResult.
+# embed_query is the caller's memoized zero-arg embedding callable (or None).
+Strategy = Callable[[str, Callable | None, Priority], IntentResult]
+
+STRATEGIES: dict[str, Strategy] = {}
+
+
+def register_strategy(name: str, fn: Strategy | None = None):
+    """Register a classifier strategy; usable as a decorator."""
+    def _register(f: Strategy) -> Strategy:
+        STRATEGIES[name] = f
+        return f
+    return _register(fn) if fn is not None else _register
+
+
+def get_strategy(name: str) -> Strategy:
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown intent strategy {name!r} (known: {', '.join(STRATEGIES)})") from None
+
+
+register_strategy("cascade", lambda q, e, p: classify_intent(q, e, priority=p))
+register_strategy("llm", lambda q, e, p: classify_intent_llm(q, e, priority=p))
+register_strategy("local", lambda q, e, p: classify_intent_local(q))
+register_strategy(
+    "embedding",
+    lambda q, e, p: classify_intent_embedding(q, e() if e else None, priority=p),
+)
+
+
+# -------------------------
+# Telemetry
+# -------------------------
+_STATS: dict[str, Counter] = defaultdict(Counter)
+_STATS_LOCK = threading.Lock()
+
+# shadow runs waiting or running; beyond the limit samples are dropped so a
+# slow shadow strategy can never build an unbounded backlog
+_SHADOW_POOL = (
+    ThreadPoolExecutor(max_workers=INTENT_SHADOW_WORKERS, thread_name_prefix="intent-shadow")
+    if INTENT_SHADOW_STRATEGIES and INTENT_SHADOW_WORKERS > 0 else None
+)
+_SHADOW_LIMIT = INTENT_SHADOW_WORKERS * 4
+_shadow_pending = 0
+
+
+def _run(name: str, query: str, embed_query, priority: Priority) -> tuple[IntentResult | None, dict]:
+    started = time.perf_counter()
+    error = None
+    with track_usage() as usage:
+        try:
+            result = get_strategy(name)(query, embed_query, priority)
+        except Exception as e:
+            result, error = None, e
+    run = {
+        "strategy": name,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        "llm_calls": usage["calls"],
+        "embed_calls": usage["embed_calls"],
+        "prompt_tokens": usage["prompt_tokens"],
+        "completion_tokens": usage["completion_tokens"],
+    }
+    if result is not None:
+        run.update(intent=result.intent.value, confidence=result.confidence)
+
+    with _STATS_LOCK:
+        s = _STATS[name]
+        s["calls"] += 1
+        s["errors"] += error is not None
+        s["latency_ms"] += run["latency_ms"]
+        for k in ("llm_calls", "embed_calls", "prompt_tokens", "completion_tokens"):
+            s[k] += run[k]
+
+    if error is not None:
+        run["error"] = repr(error)
+        if priority == Priority.INTERACTIVE:
+            raise error
+    return result, run
+
+
+def _shadow(name: str, query: str, embed_query, production: dict, thread_id: str):
+    global _shadow_pending
+    try:
+        # embed again at BULK rather than through the caller's callable, which
+        # runs at RETRIEVAL priority (the embedding cache makes this cheap)
+        if embed_query is not None:
+            embed_query = functools.cache(lambda: embed(query, priority=Priority.BULK))
+        result, run = _run(name, query, embed_query, Priority.BULK)
+        agree = result is not None and result.intent.value == production.get("intent")
+        with _STATS_LOCK:
+            _STATS[name]["compared"] += result is not None
+            _STATS[name]["agreed"] += agree
+        trace_event(
+            event_type="intent_shadow",
+            data={"query": query, "production": production, "shadow": run, "agree": agree},
+            thread_id=thread_id,
+        )
+    except Exception:
+        logger.exception("Shadow strategy %s failed", name)
+    finally:
+        with _STATS_LOCK:
+            _shadow_pending -= 1
+
+
+def classify_intent_with_shadow(query: str, embed_query=None, thread_id: str = "intent_shadow") -> IntentResult:
+    """
+    Classify with the INTENT_STRATEGY strategy. On a sampled fraction of
+    calls, every INTENT_SHADOW_STRATEGIES strategy also classifies the
+    query in the background at BULK priority; latency, token usage and
+    agreement with production are traced and aggregated in strategy_stats().
+    """
+    global _shadow_pending
+    query = canonical_text(query)
+    result, production = _run(INTENT_STRATEGY, query, embed_query, Priority.INTERACTIVE)
+
+    if _SHADOW_POOL is not None and random.random() < INTENT_SHADOW_SAMPLE_RATE:
+        for name in INTENT_SHADOW_STRATEGIES:
+            if name == INTENT_STRATEGY or name not in STRATEGIES:
+                continue
+            with _STATS_LOCK:
+                if _shadow_pending >= _SHADOW_LIMIT:
+                    _STATS[name]["dropped"] += 1
+                    continue
+                _shadow_pending += 1
+            _SHADOW_POOL.submit(_shadow, name, query, embed_query, production, thread_id)
+
+    return result
+
+
+def strategy_stats() -> dict:
+    with _STATS_LOCK:
+        strategies = {}
+        for name, s in _STATS.items():
+            calls = s["calls"] or 1
+            strategies[name] = {
+                "calls": s["calls"],
+                "errors": s["errors"],
+                "avg_latency_ms": round(s["latency_ms"] / calls, 2),
+                "avg_llm_calls": round(s["llm_calls"] / calls, 3),
+                "avg_embed_calls": round(s["embed_calls"] / calls, 3),
+                "avg_prompt_tokens": round(s["prompt_tokens"] / calls, 1),
+                "avg_completion_tokens": round(s["completion_tokens"] / calls, 1),
+            }
+            if s["compared"] or s["dropped"]:
+                strategies[name]["agreement_rate"] = round(s["agreed"] / s["compared"], 3) if s["compared"] else None
+                strategies[name]["dropped"] = s["dropped"]
+        return {
+            "production": INTENT_STRATEGY,
+            "shadow": INTENT_SHADOW_STRATEGIES,
+            "sample_rate": INTENT_SHADOW_SAMPLE_RATE,
+            "shadow_pending": _shadow_pending,
+            "strategies": strategies,
+        }
@@ -1,34 +1,375 @@
-import ollama
-from app.config import OLLAMA_MODEL, OLLAMA_BASE_URL, TEMPERATURE
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from app.cassette import get_cassette, request_key
+from app.embedding_cache import get_embedding_cache, make_embedding_key
+from app.inference_profiles import get_profile
+from app.inference_scheduler import Priority, get_scheduler
+from app.llm_cache import get_cache, make_cache_key
+from app.ollama_hosts import get_client, get_pool  # noqa: F401  (get_client re-exported)
+from app.singleflight import SingleFlight
+
+
+_LLMS: dict[str, "_OllamaWrapper"] = {}
+_LLMS_LOCK = threading.Lock()
+
+# Identical chat / embedding requests that are already in flight are joined
+# instead of being sent to Ollama again.
+_CHAT_FLIGHTS = SingleFlight()
+_EMBED_FLIGHTS = SingleFlight()
+
+# Token usage trackers and the cache-bypass flag of the current thread
+# (see track_usage and bypass_cache)
+_USAGE = threading.local()
+
+
+class _Resp:
+    def __init__(self, content: str, usage: dict | None = None):
+        self.content = content
+        # tokens this call actually cost; zero when served from cache,
+        # cassette or a coalesced in-flight request
+        self.usage = usage or {"prompt_tokens": 0, "completion_tokens": 0}
+
+
+@contextmanager
+def track_usage():
+    """
+    Sum the token usage of every invoke() and embed() made by this thread
+    inside the block:
+
+        with track_usage() as usage:
+            classify_intent_llm(query)
+        usage["prompt_tokens"], usage["completion_tokens"], usage["calls"]
+    """
+    usage = {"calls": 0, "embed_calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    stack = _USAGE.__dict__.setdefault("stack", [])
+    stack.append(usage)
+    try:
+        yield usage
+    finally:
+        stack.remove(usage)
+
+
+@contextmanager
+def bypass_cache():
+    """
+    Make invoke() calls by this thread inside the block skip response-cache
+    lookups and reach the model (their results are still cached). Used by
+    warmup, which must exercise the model even when its prompt is cached.
+    """
+    previous = getattr(_USAGE, "bypass_cache", False)
+    _USAGE.bypass_cache = True
+    try:
+        yield
+    finally:
+        _USAGE.bypass_cache = previous
+
+
+def record_usage(prompt_tokens: int = 0, completion_tokens: int = 0, embed: bool = False):
+    """
+    Add a call to this thread's track_usage() blocks. Work done for this
+    thread on another one (e.g. a micro-batcher) is recorded here by the
+    caller.
+    """
+    for usage in getattr(_USAGE, "stack", ()):
+        usage["embed_calls" if embed else "calls"] += 1
+        usage["prompt_tokens"] += prompt_tokens
+        usage["completion_tokens"] += completion_tokens
+
+
+def _estimate_tokens(messages: list) -> int:
+    return sum(len(m.get("content", "")) for m in messages) // 4 + 1
+
+
+class _JsonObjectEnd:
+    """
+    Incrementally scans streamed text and reports where the first top-level
+    JSON object closes, so generation can be cut off right there. Quoted
+    text before the object is skipped too, so a brace inside it (`"{"`) is
+    not taken for the start; such a quote ends at the line break if it is
+    never closed.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> int | None:
+        for i, ch in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"' or (ch == "\n" and not self.started):
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+                self.started = True
+            elif ch == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return None
+
+
+def _message_content(resp) -> str:
+    return resp.message.content if getattr(resp, 'message', None) else getattr(resp, 'response', '')
 
 
 class _OllamaWrapper:
-    def __init__(self, model: str, base_url: str | None = None, temperature: float | None = None):
+    def __init__(
+        self,
+        model: str,
+        base_url: str | None = None,
+        temperature: float | None = None,
+        num_ctx: int | None = None,
+        num_predict: int | None = None,
+        keep_alive: str | int | None = None,
+    ):
         self.model = model
         self.temperature = temperature
-        # create a client bound to the configured base URL (if provided)
-        self.client = ollama.Client(host=base_url) if base_url else ollama.Client()
+        self.num_ctx = num_ctx
+        self.num_predict = num_predict
+        self.keep_alive = keep_alive
+        # host pool for the given (comma-separated) base URL, or the configured hosts
+        hosts = [h.strip() for h in base_url.split(",") if h.strip()] if base_url else None
+        self.pool = get_pool(hosts)
 
-    def invoke(self, prompt: str):
+    def invoke(
+        self,
+        prompt: str,
+        priority: Priority = Priority.GENERATION,
+        format: dict | str | None = None,
+        num_predict: int | None = None,
+        stop_at_json: bool = False,
+    ):
+        """
+        format:       "json" or a JSON schema the output must follow
+        num_predict:  cap on generated tokens (defaults to the wrapper's cap)
+        stop_at_json: stream the reply and close the stream once the first
+                      JSON object is complete, instead of waiting for EOS
+        """
         # Accept either a raw prompt string or a pre-built list of message dicts
         if isinstance(prompt, (list, tuple)):
             messages = list(prompt)
         else:
             messages = [{"role": "user", "content": prompt}]
 
-        # Use the `chat` API and wrap the response to match expected interface
-        resp = self.client.chat(
-            model=self.model,
-            messages=messages,
-            options={"temperature": self.temperature} if self.temperature is not None else None,
+        num_predict = num_predict if num_predict is not None else self.num_predict
+
+        options = {}
+        if self.temperature is not None:
+            options["temperature"] = self.temperature
+        if self.num_ctx is not None:
+            options["num_ctx"] = self.num_ctx
+        if num_predict is not None:
+            options["num_predict"] = num_predict
+        options = options or None
+
+        # Replay mode answers from the cassette and never reaches Ollama
+        cassette = get_cassette()
+        if cassette:
+            cassette_key = request_key("chat", model=self.model, messages=messages, options=options, format=format)
+            if cassette.replaying:
+                record_usage()
+                return _Resp(cassette.play(cassette_key, f"chat {self.model}: {messages[-1].get('content', '')[:80]!r}"))
+
+        # Serve repeated prompts from the response cache when possible
+        cache = get_cache()
+        key = make_cache_key(self.model, messages, options, format)
+        content = cache.get(key) if cache and not getattr(_USAGE, "bypass_cache", False) else None
+        usage = {"prompt_tokens": 0, "completion_tokens": 0}
+
+        def _call(client):
+            # Use the `chat` API and wrap the response to match expected interface
+            if not stop_at_json:
+                resp = client.chat(
+                    model=self.model,
+                    messages=messages,
+                    options=options,
+                    format=format,
+                    keep_alive=self.keep_alive,
+                )
+                usage["prompt_tokens"] = getattr(resp, "prompt_eval_count", None) or 0
+                usage["completion_tokens"] = getattr(resp, "eval_count", None) or 0
+                return _message_content(resp)
+
+            stream = client.chat(
+                model=self.model,
+                messages=messages,
+                options=options,
+                format=format,
+                keep_alive=self.keep_alive,
+                stream=True,
+            )
+            scanner = _JsonObjectEnd()
+            parts = []
+            try:
+                for chunk in stream:
+                    piece = _message_content(chunk) or ""
+                    end = scanner.feed(piece)
+                    if end is not None:
+                        parts.append(piece[:end])
+                        break
+                    parts.append(piece)
+            finally:
+                # closing the stream drops the HTTP response, which makes
+                # Ollama stop generating
+                stream.close()
+            # the final chunk with real counts is never read when cut off:
+            # one chunk is one token, the prompt is estimated
+            usage["prompt_tokens"] = _estimate_tokens(messages)
+            usage["completion_tokens"] = len(parts)
+            return "".join(parts)
+
+        def _chat():
+            content = get_scheduler().run(lambda: self.pool.call(_call), priority)
+
+            if cache and content:
+                cache.set(key, content)
+            return content
+
+        if content is None:
+            content = _CHAT_FLIGHTS.do(key, _chat)
+
+        if cassette:
+            cassette.record(cassette_key, "chat", content)
+
+        record_usage(usage["prompt_tokens"], usage["completion_tokens"])
+        return _Resp(content, usage)
+
+
+def get_llm(profile: str = "answer"):
+    """
+    Shared wrapper for an inference profile ("classify", "answer", ...).
+    """
+    llm = _LLMS.get(profile)
+    if llm is None:
+        with _LLMS_LOCK:
+            llm = _LLMS.get(profile)
+            if llm is None:
+                p = get_profile(profile)
+                llm = _OllamaWrapper(
+                    model=p.model,
+                    temperature=p.temperature,
+                    num_ctx=p.num_ctx,
+                    num_predict=p.num_predict,
+                    keep_alive=p.keep_alive,
+                )
+                _LLMS[profile] = llm
+    return llm
+
+
+def _unit(embedding) -> list[float]:
+    """Scale to unit length; /api/embeddings returns raw vectors, /api/embed unit ones."""
+    v = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(v)
+    return (v / norm if norm else v).tolist()
+
+
+def embed(prompt: str, model: str | None = None, priority: Priority = Priority.RETRIEVAL) -> list[float]:
+    """
+    Embed a single prompt with the "embed" profile through the host pool.
+    The vector is normalised to unit length, like embed_batch() results, so
+    the two share cache entries.
+    """
+    profile = get_profile("embed")
+    model = model or profile.model
+    options = {"num_ctx": profile.num_ctx} if profile.num_ctx else None
+
+    cassette = get_cassette()
+    if cassette:
+        cassette_key = request_key("embed", model=model, prompt=prompt)
+        if cassette.replaying:
+            record_usage(embed=True)
+            return cassette.play(cassette_key, f"embed {model}: {prompt[:80]!r}")
+
+    # Repeated texts (mostly repeat policy questions) skip Ollama entirely
+    cache = get_embedding_cache()
+    key = make_embedding_key(model, prompt)
+    embedding = cache.get(key) if cache else None
+
+    def _embed():
+        embedding = get_scheduler().run(
+            lambda: get_pool().call(
+                lambda client: client.embeddings(
+                    model=model,
+                    prompt=prompt,
+                    options=options,
+                    keep_alive=profile.keep_alive,
+                )["embedding"]
+            ),
+            priority,
         )
+        if embedding:
+            embedding = _unit(embedding)
+        if cache and embedding:
+            cache.set(key, embedding)
+        return embedding
 
-        class _Resp:
-            def __init__(self, content: str):
-                self.content = content
+    if embedding is None:
+        embedding = _EMBED_FLIGHTS.do(key, _embed)
 
-        return _Resp(resp.message.content if getattr(resp, 'message', None) else getattr(resp, 'response', ''))
+    if cassette:
+        cassette.record(cassette_key, "embed", embedding)
+    record_usage(embed=True)
+    return embedding
+
+
+def embed_batch(prompts: list[str], model: str | None = None, priority: Priority = Priority.RETRIEVAL) -> list[list[float]]:
+    """
+    Embed several prompts with one Ollama /api/embed call. Cached and
+    duplicate prompts are only embedded once. Results are unit length, as
+    from embed(), and share its cache entries.
+    """
+    profile = get_profile("embed")
+    model = model or profile.model
+    options = {"num_ctx": profile.num_ctx} if profile.num_ctx else None
+
+    cassette = get_cassette()
+    cassette_keys = [request_key("embed", model=model, prompt=p) for p in prompts] if cassette else None
+    if cassette and cassette.replaying:
+        record_usage(embed=True)
+        return [cassette.play(k, f"embed {model}: {p[:80]!r}") for k, p in zip(cassette_keys, prompts)]
+
+    cache = get_embedding_cache()
+    keys = [make_embedding_key(model, p) for p in prompts]
+    found = {}
+    for key in dict.fromkeys(keys):
+        embedding = cache.get(key) if cache else None
+        if embedding is not None:
+            found[key] = embedding
+
+    missing = {key: prompt for key, prompt in zip(keys, prompts) if key not in found}
+    if missing:
+        embeddings = get_scheduler().run(
+            lambda: get_pool().call(
+                lambda client: client.embed(
+                    model=model,
+                    input=list(missing.values()),
+                    options=options,
+                    keep_alive=profile.keep_alive,
+                )["embeddings"]
+            ),
+            priority,
+        )
+        for key, embedding in zip(missing, embeddings):
+            embedding = _unit(embedding)
+            found[key] = embedding
+            if cache:
+                cache.set(key, embedding)
+        record_usage(embed=True)
 
+    results = [found[key] for key in keys]
+    if cassette:
+        for k, embedding in zip(cassette_keys, results):
+            cassette.record(k, "embed", embedding)
+    return results
 
-def get_llm():
-    return _OllamaWrapper(model=OLLAMA_MODEL, base_url=OLLAMA_BASE_URL, temperature=TEMPERATURE)
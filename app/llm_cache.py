@@ -0,0 +1,61 @@
+import hashlib
+import json
+import threading
+
+from app.config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_MEMORY_ENTRIES,
+)
+from app.sqlite_lru import SQLiteLRUCache
+
+
+def make_cache_key(model: str, messages: list, options: dict | None, format=None) -> str:
+    """
+    Stable key for a chat call: model + full message list + options
+    (+ the requested output format, if any).
+    """
+    payload = json.dumps(
+        {"model": model, "messages": messages, "options": options or {}, "format": format},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache(SQLiteLRUCache):
+    """Chat response cache (see app/sqlite_lru.py); values are the response JSON text."""
+
+    def __init__(
+        self,
+        db_path: str = LLM_CACHE_PATH,
+        ttl: float = LLM_CACHE_TTL,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+    ):
+        super().__init__(
+            "llm_cache",
+            db_path,
+            ttl=ttl,
+            max_entries=max_entries,
+            memory_entries=memory_entries,
+        )
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache() -> LLMCache | None:
+    """Process-wide cache, or None when LLM_CACHE_ENABLED is off."""
+    global _CACHE
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = LLMCache()
+    return _CACHE
@@ -1,6 +1,14 @@
 from app.llm import get_llm
-from app.intent_schema import IntentResult, IntentLabel
+from app.config import CLASSIFIER_STRUCTURED_OUTPUT, CLASSIFIER_BATCH_MAX_SIZE, CLASSIFIER_BATCH_OUTPUT_TOKENS
+from app.canonicalize import canonical_text
+from app.fewshot import FewShotSelector, LABEL_REASONS
+from app.inference_scheduler import Priority
+from app.phrase_matcher import PhraseMatcher
+from app.intent_schema import IntentResult, IntentLabel, BatchIntentOutput
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 SYSTEM_PROMPT = """
@@ -87,17 +95,48 @@ Output:
 '''
 
 
-def classify_intent_llm(query: str) -> IntentResult:
-    llm = get_llm()
+# Keyword fallback when the LLM output can't be parsed, in priority order
+FALLBACK_KEYWORDS = PhraseMatcher({
+    IntentLabel.REFUND.value: ["refund", "money back"],
+    IntentLabel.POLICY.value: ["return", "return policy"],
+    IntentLabel.ORDER_STATUS.value: ["order", "track", "where is my"],
+})
+
+FALLBACK_RESULTS = {
+    IntentLabel.REFUND.value: (0.8, "Keyword match: refund"),
+    IntentLabel.POLICY.value: (0.75, "Keyword match: return"),
+    IntentLabel.ORDER_STATUS.value: (0.7, "Keyword match: order status"),
+}
+
+
+FEWSHOT = FewShotSelector(
+    "intent",
+    EXAMPLES,
+    lambda label: {"intent": label, "confidence": 0.9, "reason": LABEL_REASONS[label]},
+)
+
 
-    # Provide the system prompt plus a few-shot examples to the model
+def classify_intent_llm(query: str, embed_query=None, priority: Priority = Priority.INTERACTIVE) -> IntentResult:
+    llm = get_llm("classify")
+
+    # Provide the system prompt plus the most similar few-shot examples
+    examples = FEWSHOT.select(query, embed_query, priority=priority) or EXAMPLES
     messages = [
         {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "system", "content": EXAMPLES},
+        {"role": "system", "content": examples},
         {"role": "user", "content": query},
     ]
 
-    response = llm.invoke(messages)
+    if CLASSIFIER_STRUCTURED_OUTPUT:
+        # Schema-constrained, token-capped, cut off once the JSON object closes
+        response = llm.invoke(
+            messages,
+            priority=priority,
+            format=IntentResult.model_json_schema(),
+            stop_at_json=True,
+        )
+    else:
+        response = llm.invoke(messages, priority=priority)
 
     def _extract_json(text: str):
         import json, re
@@ -126,16 +165,125 @@ def classify_intent_llm(query: str) -> IntentResult:
 
     # Fallback for safety
     # If parsing failed, use a simple keyword-based heuristic as a final fallback
-    q = query.lower()
-    if "refund" in q or "money back" in q:
-        return IntentResult(intent=IntentLabel.REFUND, confidence=0.8, reason="Keyword match: refund")
-    if "return" in q or "return policy" in q:
-        return IntentResult(intent=IntentLabel.POLICY, confidence=0.75, reason="Keyword match: return")
-    if "order" in q or "track" in q or "where is my" in q:
-        return IntentResult(intent=IntentLabel.ORDER_STATUS, confidence=0.7, reason="Keyword match: order status")
+    label = FALLBACK_KEYWORDS.first_label(query)
+    if label:
+        confidence, reason = FALLBACK_RESULTS[label]
+        return IntentResult(intent=IntentLabel(label), confidence=confidence, reason=reason)
 
     return IntentResult(
         intent=IntentLabel.OTHER,
         confidence=0.3,
         reason="Failed to parse LLM output",
     )
+
+
+# -------------------------
+# Batch classification (offline triage, evaluation, backfills)
+# -------------------------
+BATCH_SYSTEM_PROMPT = """
+You are an intent classification system for a customer support agent.
+
+You will receive several numbered customer messages. Classify EACH message
+independently into one of:
+- POLICY
+- ORDER_STATUS
+- REFUND
+- OTHER
+
+Return ONLY valid JSON in this exact format, with one result per message:
+
+{
+  "results": [
+    {"id": <message number>, "intent": "<INTENT>", "confidence": <number between 0 and 1>, "reason": "<short explanation>"}
+  ]
+}
+
+Rules:
+- POLICY: questions about returns, policies, eligibility
+- ORDER_STATUS: tracking or order status queries
+- REFUND: explicit refund or money-back requests
+- OTHER: greetings or irrelevant messages
+"""
+
+
+def _estimate_tokens(text: str) -> int:
+    # rough chars-per-token estimate, good enough for budgeting
+    return len(text) // 4 + 1
+
+
+def _render_batch(queries: list[str]) -> str:
+    return "\n".join(f"{i}. {json.dumps(q)}" for i, q in enumerate(queries, 1))
+
+
+def _pack_batches(queries: list[str], token_budget: int, max_size: int) -> list[list[int]]:
+    """Greedily group query indices so each call fits the context budget."""
+    batches, current, used = [], [], 0
+    for i, query in enumerate(queries):
+        cost = _estimate_tokens(query) + 4 + CLASSIFIER_BATCH_OUTPUT_TOKENS
+        if current and (used + cost > token_budget or len(current) >= max_size):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _classify_batch(llm, queries: list[str], priority: Priority) -> list[IntentResult]:
+    if len(queries) == 1:
+        return [classify_intent_llm(queries[0], priority=priority)]
+
+    messages = [
+        {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+        {"role": "system", "content": EXAMPLES},
+        {"role": "user", "content": _render_batch(queries)},
+    ]
+    kwargs = {"num_predict": CLASSIFIER_BATCH_OUTPUT_TOKENS * len(queries) + 16}
+    if CLASSIFIER_STRUCTURED_OUTPUT:
+        kwargs.update(format=BatchIntentOutput.model_json_schema(), stop_at_json=True)
+
+    results = {}
+    try:
+        response = llm.invoke(messages, priority=priority, **kwargs)
+        parsed = BatchIntentOutput.model_validate_json(response.content)
+        for item in parsed.results:
+            if 1 <= item.id <= len(queries):
+                results[item.id - 1] = IntentResult(intent=item.intent, confidence=item.confidence, reason=item.reason)
+    except Exception:
+        logger.warning("Batch of %d queries returned incomplete output, splitting", len(queries))
+
+    if len(results) == len(queries):
+        return [results[i] for i in range(len(queries))]
+
+    # Truncated or malformed output: halve and retry the batch
+    mid = len(queries) // 2
+    return _classify_batch(llm, queries[:mid], priority) + _classify_batch(llm, queries[mid:], priority)
+
+
+def classify_intents_batch(queries: list[str], priority: Priority = Priority.BULK) -> list[IntentResult]:
+    """
+    Classify many queries with as few LLM calls as possible. The system
+    prompt and examples are sent once per batch; batches are sized to fit
+    the classify profile's context window and are split in half whenever
+    the model's answer can't be matched back to every query.
+
+    Results are returned in input order.
+    """
+    if not queries:
+        return []
+
+    # Canonical duplicates (same text up to case, punctuation, order id)
+    # are classified once
+    canonical = [canonical_text(q) for q in queries]
+    unique = list(dict.fromkeys(canonical))
+
+    llm = get_llm("classify")
+    overhead = _estimate_tokens(BATCH_SYSTEM_PROMPT) + _estimate_tokens(EXAMPLES)
+    token_budget = max((llm.num_ctx or 2048) - overhead, CLASSIFIER_BATCH_OUTPUT_TOKENS * 2)
+
+    results: dict[str, IntentResult] = {}
+    for batch in _pack_batches(unique, token_budget, CLASSIFIER_BATCH_MAX_SIZE):
+        texts = [unique[i] for i in batch]
+        results.update(zip(texts, _classify_batch(llm, texts, priority)))
+    return [results[c] for c in canonical]
@@ -1,6 +1,16 @@
 from app.llm import get_llm
-from app.intent_schema import IntentResult, MultiIntentResult, IntentLabel
+from app.config import (
+    CLASSIFIER_STRUCTURED_OUTPUT,
+    CLASSIFIER_NUM_PREDICT,
+    LOCAL_CLASSIFIER_ENABLED,
+    LOCAL_CLASSIFIER_THRESHOLD,
+)
+from app.canonicalize import canonical_text
+from app.fewshot import FewShotSelector, LABEL_REASONS
+from app.inference_scheduler import Priority
+from app.intent_schema import IntentResult, MultiIntentResult, MultiIntentOutput, IntentLabel
 from app.intent_priority import INTENT_PRIORITY
+from app.local_intent_classifier import classify_intent_local
 import json
 
 
@@ -56,16 +66,46 @@ Output:
 '''
 
 
-def classify_multi_intent(query: str) -> MultiIntentResult:
-    llm = get_llm()
+FEWSHOT = FewShotSelector(
+    "multi_intent",
+    EXAMPLES,
+    lambda label: {"intents": [{"intent": label, "confidence": 0.9, "reason": LABEL_REASONS[label]}]},
+)
 
+
+def classify_multi_intent(query: str, embed_query=None) -> MultiIntentResult:
+    query = canonical_text(query)
+
+    # Fast path: a confident local classification skips the LLM round trip
+    if LOCAL_CLASSIFIER_ENABLED:
+        local = classify_intent_local(query)
+        if local.confidence >= LOCAL_CLASSIFIER_THRESHOLD:
+            return MultiIntentResult(
+                intents=[local],
+                chosen_intent=local.intent,
+                reason=f"Local fast path ({local.confidence})",
+            )
+
+    llm = get_llm("classify")
+
+    examples = FEWSHOT.select(query, embed_query) or EXAMPLES
     messages = [
         {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "system", "content": EXAMPLES},
+        {"role": "system", "content": examples},
         {"role": "user", "content": query},
     ]
 
-    response = llm.invoke(messages)
+    if CLASSIFIER_STRUCTURED_OUTPUT:
+        # Schema-constrained, token-capped, cut off once the JSON object closes
+        response = llm.invoke(
+            messages,
+            priority=Priority.INTERACTIVE,
+            format=MultiIntentOutput.model_json_schema(),
+            num_predict=CLASSIFIER_NUM_PREDICT * 2,
+            stop_at_json=True,
+        )
+    else:
+        response = llm.invoke(messages, priority=Priority.INTERACTIVE)
 
     def _extract_json(text: str):
         import json, re
@@ -0,0 +1,190 @@
+import json
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from app.canonicalize import ORDER_ID_PLACEHOLDER
+from app.config import INTENT_EXAMPLES_PATH, LOCAL_CLASSIFIER_THRESHOLD
+from app.intent_schema import IntentResult, IntentLabel
+from app.phrase_matcher import PhraseMatcher
+
+logger = logging.getLogger(__name__)
+
+# -------------------------
+# Rules for the obvious cases
+# -------------------------
+# raw ids in training examples, the placeholder in canonicalized queries
+ORDER_ID_RE = re.compile(rf"\bORD\d+\b|{re.escape(ORDER_ID_PLACEHOLDER)}", re.I)
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+STATUS_WORDS = {"where", "status", "track", "tracking", "shipped", "arrive", "arrived", "delivered", "happened", "late", "delayed"}
+
+REFUND_ACTION_PHRASES = PhraseMatcher([
+    "refund me",
+    "refund my",
+    "money back",
+    "want a refund",
+    "need a refund",
+    "process my refund",
+    "initiate a refund",
+    "give me a refund",
+    "demand a refund",
+    "refund please",
+])
+
+POLICY_WORDS = {"return", "returns", "returnable", "policy", "replace", "replacement", "exchange", "eligible", "window"}
+QUESTION_STARTERS = ("can i", "can we", "what", "is ", "are ", "how", "do you", "does", "am i")
+
+# The model alone never claims more than this, which stays under the
+# cascade gate: it is trained on a few dozen rows, so without a rule
+# agreeing its answer always goes on to the LLM.
+MODEL_ONLY_MAX_CONFIDENCE = min(0.7, LOCAL_CLASSIFIER_THRESHOLD - 0.05)
+
+GREETINGS = {"hi", "hello", "hey", "hi there", "good morning", "good evening", "good afternoon", "thanks", "thank you", "bye"}
+
+
+def _tokens(text: str) -> list[str]:
+    text = ORDER_ID_RE.sub(" ordid ", text.lower())
+    words = WORD_RE.findall(text)
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def _rule_intent(query: str) -> IntentResult | None:
+    q = query.lower().strip()
+    words = set(WORD_RE.findall(q))
+    has_order_id = bool(ORDER_ID_RE.search(query))
+    refund_action = REFUND_ACTION_PHRASES.search(q)
+
+    if refund_action:
+        return IntentResult(intent=IntentLabel.REFUND, confidence=0.95, reason="Local rule: refund request phrase")
+
+    if has_order_id and words & STATUS_WORDS:
+        return IntentResult(intent=IntentLabel.ORDER_STATUS, confidence=0.95, reason="Local rule: order id with status words")
+
+    if "refund" not in words and words & POLICY_WORDS and q.startswith(QUESTION_STARTERS):
+        return IntentResult(intent=IntentLabel.POLICY, confidence=0.9, reason="Local rule: return/policy question")
+
+    if q.rstrip("!.? ") in GREETINGS:
+        return IntentResult(intent=IntentLabel.OTHER, confidence=0.95, reason="Local rule: greeting")
+
+    return None
+
+
+# -------------------------
+# Small linear model (multinomial naive Bayes)
+# -------------------------
+class NaiveBayesIntentModel:
+    """
+    Multinomial naive Bayes over word unigrams + bigrams with Laplace
+    smoothing. Trains in microseconds on the labelled example file.
+    """
+
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self.vocab: set[str] = set()
+        self.log_prior: dict[IntentLabel, float] = {}
+        self.log_likelihood: dict[IntentLabel, dict[str, float]] = {}
+        self.log_unseen: dict[IntentLabel, float] = {}
+
+    def fit(self, examples: list[tuple[str, IntentLabel]]):
+        counts: dict[IntentLabel, Counter] = defaultdict(Counter)
+        docs = Counter()
+        for text, label in examples:
+            toks = _tokens(text)
+            counts[label].update(toks)
+            docs[label] += 1
+            self.vocab.update(toks)
+
+        total_docs = sum(docs.values())
+        v = len(self.vocab)
+        for label, c in counts.items():
+            total = sum(c.values()) + self.alpha * v
+            self.log_prior[label] = math.log(docs[label] / total_docs)
+            self.log_likelihood[label] = {t: math.log((n + self.alpha) / total) for t, n in c.items()}
+            self.log_unseen[label] = math.log(self.alpha / total)
+        return self
+
+    def predict(self, text: str) -> tuple[IntentLabel, float, float]:
+        """Returns (label, posterior probability, share of known tokens)."""
+        toks = [t for t in _tokens(text) if t in self.vocab]
+        all_toks = _tokens(text)
+        coverage = len(toks) / len(all_toks) if all_toks else 0.0
+
+        scores = {}
+        for label, prior in self.log_prior.items():
+            ll = self.log_likelihood[label]
+            unseen = self.log_unseen[label]
+            scores[label] = prior + sum(ll.get(t, unseen) for t in toks)
+
+        best = max(scores, key=scores.get)
+        top = scores[best]
+        norm = sum(math.exp(s - top) for s in scores.values())
+        return best, 1.0 / norm, coverage
+
+
+def load_labelled_examples(path: str = INTENT_EXAMPLES_PATH) -> list[tuple[str, IntentLabel]]:
+    examples = []
+    p = Path(path)
+    if not p.exists():
+        logger.warning("Intent example file %s not found", path)
+        return examples
+    with open(p, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                examples.append((row["query"], IntentLabel(row["intent"])))
+    return examples
+
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+
+def get_model() -> NaiveBayesIntentModel | None:
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                examples = load_labelled_examples()
+                _MODEL = NaiveBayesIntentModel().fit(examples) if examples else False
+    return _MODEL or None
+
+
+def classify_intent_local(query: str) -> IntentResult:
+    """
+    CPU-only classifier: rules for the clear-cut cases, agreed with (or
+    overruled by) a naive Bayes model. The confidence is meant to be gated:
+    anything below the threshold should go to the LLM classifier.
+    """
+    rule = _rule_intent(query)
+    model = get_model()
+
+    if model is None:
+        return rule or IntentResult(intent=IntentLabel.OTHER, confidence=0.0, reason="Local: no rule matched")
+
+    label, prob, coverage = model.predict(query)
+    # unknown words make the model's posterior meaningless, so discount it
+    model_conf = round(prob * coverage, 3)
+
+    if rule is not None:
+        if rule.intent == label:
+            return IntentResult(
+                intent=rule.intent,
+                confidence=round(max(rule.confidence, model_conf), 3),
+                reason=f"{rule.reason}; local model agrees",
+            )
+        # rule and model disagree: not a clear-cut case
+        return IntentResult(
+            intent=rule.intent,
+            confidence=round(min(rule.confidence, 0.6), 3),
+            reason=f"{rule.reason}; local model says {label.value}",
+        )
+
+    return IntentResult(
+        intent=label,
+        confidence=min(model_conf, MODEL_ONLY_MAX_CONFIDENCE),
+        reason=f"Local model (naive Bayes, p={prob:.2f}, coverage={coverage:.2f})",
+    )
@@ -1,10 +1,51 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from app.api.routes import router
+from app.cassette import get_cassette
+from app.embedding_cache import get_embedding_cache
+from app.inference_scheduler import get_scheduler
+from app.intent_strategies import strategy_stats
+from app.llm_cache import get_cache
+from app.ollama_hosts import get_pool
+from app.rag.rag_answer import batching_stats
+from app.router import speculation_stats
+from app.warmup import start_warmup, is_ready, warmup_status
 
 app = FastAPI(title="Agentic Customer Support AI")
 
 app.include_router(router)
 
+
+@app.on_event("startup")
+def warmup_models():
+    # preload + warm in the background; /ready reports when it is done
+    start_warmup()
+
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def readiness_check():
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up", **warmup_status()})
+    return {"status": "ready", **warmup_status()}
+
+
+@app.get("/metrics")
+def metrics():
+    cache = get_cache()
+    cassette = get_cassette()
+    embedding_cache = get_embedding_cache()
+    return {
+        "scheduler": get_scheduler().stats(),
+        "llm_cache": cache.stats() if cache else None,
+        "embedding_cache": embedding_cache.stats() if embedding_cache else None,
+        "ollama_hosts": get_pool().stats(),
+        "cassette": cassette.stats() if cassette else None,
+        "speculative_retrieval": speculation_stats(),
+        "retrieval_batching": batching_stats(),
+        "intent_strategies": strategy_stats(),
+    }
@@ -0,0 +1,98 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class MicroBatcher:
+    """
+    Collect items submitted by concurrent callers for up to `max_wait_ms`
+    (or until `max_batch` items are waiting) and process them with one call
+    of `process(items) -> results`, which must return one result per item
+    in order. Each caller blocks until its own result is ready; if the batch
+    call raises, every caller in the batch gets the exception.
+
+    Up to `concurrency` batches run at once. While they run, new items keep
+    queueing, so batches grow with load rather than with the wait.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[list], list],
+        max_batch: int = 32,
+        max_wait_ms: float = 5,
+        concurrency: int = 1,
+        name: str = "micro-batcher",
+    ):
+        self.process = process
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+
+        self._queue: queue.Queue[tuple[Any, Future]] = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name)
+        # the collector waits for a free runner before forming a batch
+        self._slots = threading.Semaphore(concurrency)
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self.items = 0
+        self.batches = 0
+        self.max_seen = 0
+
+    def submit(self, item) -> Any:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._collect, name=f"{self.name}-collector", daemon=True)
+                    self._thread.start()
+        future = Future()
+        self._queue.put((item, future))
+        return future.result()
+
+    def _collect(self):
+        while True:
+            self._slots.acquire()
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._executor.submit(self._run, batch)
+            except RuntimeError:
+                # executors refuse work once the interpreter starts shutting
+                # down; finish the batch here so its callers are not left
+                # waiting (and holding up exit)
+                self._run(batch)
+
+    def _run(self, batch: list[tuple[Any, Future]]):
+        try:
+            self.items += len(batch)
+            self.batches += 1
+            self.max_seen = max(self.max_seen, len(batch))
+            try:
+                results = self.process([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: {len(results)} results for {len(batch)} items")
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch": self.max_seen,
+            "queued": self._queue.qsize(),
+        }
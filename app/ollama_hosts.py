@@ -0,0 +1,293 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable
+
+import httpx
+import ollama
+
+from app.config import (
+    OLLAMA_HOSTS,
+    OLLAMA_POOL_SIZE,
+    OLLAMA_TIMEOUT,
+    OLLAMA_CONNECT_TIMEOUT,
+    OLLAMA_KEEPALIVE_EXPIRY,
+    OLLAMA_HEALTH_INTERVAL,
+    OLLAMA_HEDGE_AFTER,
+    OLLAMA_MAX_HEDGES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Errors that say "this host is unreachable / broken", as opposed to a bad
+# request that would fail on any host.
+_HOST_ERRORS = (httpx.TransportError, ConnectionError)
+
+
+# One ollama.Client (and so one httpx keep-alive pool) per host, shared by the
+# whole process. httpx clients are thread-safe, so the FastAPI threadpool and
+# the asyncio executors all reuse the same open connections.
+_CLIENTS: dict[str, ollama.Client] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(host: str | None = None) -> ollama.Client:
+    host = host or OLLAMA_HOSTS[0]
+    client = _CLIENTS.get(host)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(host)
+            if client is None:
+                client = ollama.Client(
+                    host=host,
+                    timeout=httpx.Timeout(OLLAMA_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT),
+                    limits=httpx.Limits(
+                        max_connections=OLLAMA_POOL_SIZE,
+                        max_keepalive_connections=OLLAMA_POOL_SIZE,
+                        keepalive_expiry=OLLAMA_KEEPALIVE_EXPIRY,
+                    ),
+                )
+                _CLIENTS[host] = client
+    return client
+
+
+class _Host:
+    def __init__(self, url: str):
+        self.url = url
+        self.client = get_client(url)
+        self.outstanding = 0
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+        self.latency_ewma = 0.0
+
+
+class HostPool:
+    """
+    Spread Ollama calls over several hosts.
+
+    - least-outstanding-requests selection among healthy hosts
+    - a background thread probes every host and takes failing ones out of
+      rotation until they answer again
+    - a call still running after `hedge_after` seconds is duplicated on a
+      second host and the first answer wins; at most `max_hedges` hedged
+      pairs run at once, counted until the slower request finishes, so the
+      extra load beyond the scheduler's limit stays bounded
+    """
+
+    def __init__(
+        self,
+        hosts: list[str],
+        health_interval: float = OLLAMA_HEALTH_INTERVAL,
+        hedge_after: float = OLLAMA_HEDGE_AFTER,
+        max_hedges: int = OLLAMA_MAX_HEDGES,
+    ):
+        self.hosts = [_Host(url) for url in hosts]
+        self.health_interval = health_interval
+        self.hedge_after = hedge_after
+        self.max_hedges = max_hedges
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+        self.hedges_in_flight = 0
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._stop = threading.Event()
+
+        if len(self.hosts) > 1:
+            if hedge_after > 0 and max_hedges > 0:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=OLLAMA_POOL_SIZE * len(self.hosts),
+                    thread_name_prefix="ollama-hedge",
+                )
+            if health_interval > 0:
+                threading.Thread(
+                    target=self._health_loop,
+                    name="ollama-health",
+                    daemon=True,
+                ).start()
+
+    # -------------------------
+    # host selection
+    # -------------------------
+    def _pick(self, exclude: _Host | None = None) -> _Host | None:
+        with self._lock:
+            candidates = [h for h in self.hosts if h is not exclude and h.healthy]
+            if not candidates:
+                # every host looks down: keep trying rather than failing fast
+                candidates = [h for h in self.hosts if h is not exclude]
+            if not candidates:
+                return None
+            host = min(candidates, key=lambda h: (h.outstanding, h.latency_ewma))
+            host.outstanding += 1
+            return host
+
+    def _run(self, host: _Host, fn: Callable[[ollama.Client], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            result = fn(host.client)
+        except _HOST_ERRORS:
+            with self._lock:
+                host.failures += 1
+                host.healthy = False
+            raise
+        finally:
+            with self._lock:
+                host.outstanding -= 1
+                host.requests += 1
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            host.latency_ewma = elapsed if not host.latency_ewma else 0.8 * host.latency_ewma + 0.2 * elapsed
+        return result
+
+    def mark_unhealthy(self, host: _Host):
+        """Take a host out of rotation until a health probe sees it answer."""
+        with self._lock:
+            host.failures += 1
+            host.healthy = False
+
+    # -------------------------
+    # calls
+    # -------------------------
+    def call(self, fn: Callable[[ollama.Client], Any]) -> Any:
+        primary = self._pick()
+
+        if self._executor is None:
+            try:
+                return self._run(primary, fn)
+            except _HOST_ERRORS:
+                # fail over once to another host
+                backup = self._pick(exclude=primary)
+                if backup is None:
+                    raise
+                logger.warning("Ollama host %s failed, retrying on %s", primary.url, backup.url)
+                return self._run(backup, fn)
+
+        first = self._executor.submit(self._run, primary, fn)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            error = first.exception()
+            if error is None:
+                return first.result()
+            # a bad request fails the same way on any host: no duplicate
+            if not isinstance(error, _HOST_ERRORS):
+                raise error
+            # the host failed fast: fail over once, which is not a hedge
+            backup = self._pick(exclude=primary)
+            if backup is None:
+                raise error
+            logger.warning("Ollama host %s failed, retrying on %s", primary.url, backup.url)
+            return self._run(backup, fn)
+
+        # still running after hedge_after: duplicate on a second host, unless
+        # too many hedged pairs are still running
+        with self._lock:
+            capped = self.hedges_in_flight >= self.max_hedges
+            if capped:
+                self.hedges_skipped += 1
+            else:
+                self.hedges_in_flight += 1
+        if capped:
+            return first.result()
+        backup = self._pick(exclude=primary)
+        if backup is None:
+            with self._lock:
+                self.hedges_in_flight -= 1
+            return first.result()
+
+        with self._lock:
+            self.hedged += 1
+        second = self._executor.submit(self._run, backup, fn)
+
+        # the pair holds its hedge slot until both requests are finished
+        remaining = [2]
+
+        def _finished(_):
+            with self._lock:
+                remaining[0] -= 1
+                if not remaining[0]:
+                    self.hedges_in_flight -= 1
+
+        first.add_done_callback(_finished)
+        second.add_done_callback(_finished)
+
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is None:
+                    if fut is second:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    # the slower request is left to finish in the background
+                    return fut.result()
+                error = fut.exception()
+        raise error
+
+    # -------------------------
+    # health probes
+    # -------------------------
+    def _probe(self, host: _Host) -> bool:
+        try:
+            host.client.list()
+            return True
+        except Exception:
+            return False
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            for host in self.hosts:
+                healthy = self._probe(host)
+                if healthy != host.healthy:
+                    logger.warning(
+                        "Ollama host %s is now %s",
+                        host.url,
+                        "healthy" if healthy else "unhealthy",
+                    )
+                with self._lock:
+                    host.healthy = healthy
+
+    def close(self):
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "hedges_in_flight": self.hedges_in_flight,
+                "hedges_skipped": self.hedges_skipped,
+                "hosts": [
+                    {
+                        "url": h.url,
+                        "healthy": h.healthy,
+                        "outstanding": h.outstanding,
+                        "requests": h.requests,
+                        "failures": h.failures,
+                        "latency_ewma_ms": h.latency_ewma * 1000,
+                    }
+                    for h in self.hosts
+                ],
+            }
+
+
+_POOLS: dict[tuple[str, ...], HostPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(hosts: list[str] | None = None) -> HostPool:
+    key = tuple(hosts or OLLAMA_HOSTS)
+    pool = _POOLS.get(key)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None:
+                pool = HostPool(list(key))
+                _POOLS[key] = pool
+    return pool
@@ -0,0 +1,114 @@
+from collections import deque
+from typing import Iterable, Iterator, Mapping, NamedTuple
+
+
+class PhraseMatch(NamedTuple):
+    start: int
+    end: int
+    phrase: str
+    label: str
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of phrases. Built once, then
+    every occurrence of every phrase in a text is found in a single pass,
+    so the cost of a check depends on the text length, not on how many
+    phrases there are.
+
+    Phrases are matched as case-insensitive substrings (the same semantics
+    as `any(p in text.lower() for p in phrases)`). Pass a mapping of
+    label -> phrases to know which group matched; a plain iterable puts
+    every phrase under the label "match".
+    """
+
+    def __init__(self, phrases: Mapping[str, Iterable[str]] | Iterable[str]):
+        if not isinstance(phrases, Mapping):
+            phrases = {"match": phrases}
+
+        # state 0 is the root; _goto[s] maps a character to the next state
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # phrases ending at each state, including those reached via fail links
+        self._out: list[list[tuple[str, str]]] = [[]]
+        self.labels_in_order: list[str] = []
+        self._size = 0
+
+        for label, group in phrases.items():
+            self.labels_in_order.append(label)
+            for phrase in group:
+                self._add(phrase.casefold(), label)
+        self._build()
+
+    def _add(self, phrase: str, label: str):
+        if not phrase:
+            return
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        if (phrase, label) not in self._out[state]:
+            self._out[state].append((phrase, label))
+            self._size += 1
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _step(self, state: int, ch: str) -> int:
+        goto, fail = self._goto, self._fail
+        while state and ch not in goto[state]:
+            state = fail[state]
+        return goto[state].get(ch, 0)
+
+    def iter_matches(self, text: str) -> Iterator[PhraseMatch]:
+        state = 0
+        for i, ch in enumerate(text.casefold()):
+            state = self._step(state, ch)
+            for phrase, label in self._out[state]:
+                yield PhraseMatch(i + 1 - len(phrase), i + 1, phrase, label)
+
+    def find_all(self, text: str) -> list[PhraseMatch]:
+        return list(self.iter_matches(text))
+
+    def search(self, text: str) -> bool:
+        """True if any phrase occurs in the text (stops at the first hit)."""
+        return next(self.iter_matches(text), None) is not None
+
+    def labels(self, text: str) -> set[str]:
+        return {m.label for m in self.iter_matches(text)}
+
+    def first_label(self, text: str, default: str | None = None) -> str | None:
+        """The earliest-declared label with a hit, for prioritised phrase groups."""
+        hits = self.labels(text)
+        return next((label for label in self.labels_in_order if label in hits), default)
+
+    def startswith(self, text: str) -> bool:
+        """True if the text starts with any phrase."""
+        state = 0
+        for depth, ch in enumerate(text.casefold(), 1):
+            state = self._goto[state].get(ch)
+            if state is None:
+                return False
+            # _out also holds phrases that are proper suffixes of this prefix
+            if any(len(phrase) == depth for phrase, _ in self._out[state]):
+                return True
+        return False
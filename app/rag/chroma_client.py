@@ -1,13 +1,20 @@
 from pathlib import Path
+import logging
+import math
 import threading
 
+from app.config import VECTOR_BACKEND, VECTOR_STORE_DIR, VECTOR_QUANTIZATION, VECTOR_RESCORE_FACTOR
+from app.rag.vector_store import NumpyVectorClient
+
+logger = logging.getLogger(__name__)
+
 # Centralized Chroma client helper for the project
 CHROMA_DIR = Path("data/embeddings").resolve()
 CHROMA_DIR.mkdir(parents=True, exist_ok=True)
 
 
-# Try to import chromadb; if unavailable, provide a lightweight in-memory
-# fallback so the app can run without the dependency (useful for CI or dev).
+# Try to import chromadb; without it (or with VECTOR_BACKEND=numpy) the
+# memory-mapped NumPy store in vector_store.py is used instead.
 try:
     import chromadb
 
@@ -16,13 +23,39 @@ except Exception:
     chromadb = None  # type: ignore[assignment]
     _HAS_CHROMADB = False
 
+USE_CHROMADB = _HAS_CHROMADB and VECTOR_BACKEND in ("auto", "chroma")
+if VECTOR_BACKEND == "chroma" and not _HAS_CHROMADB:
+    logger.warning("VECTOR_BACKEND=chroma but chromadb is not installed; using the NumPy vector store")
+if USE_CHROMADB and VECTOR_QUANTIZATION != "none":
+    logger.warning(
+        "VECTOR_QUANTIZATION=%s only applies to the NumPy vector store and is ignored with chromadb "
+        "(set VECTOR_BACKEND=numpy to use it)",
+        VECTOR_QUANTIZATION,
+    )
+
+
+def unit_vector(vector) -> list[float]:
+    """
+    Scale an embedding to unit length. Stored and query vectors are both
+    normalised, so rankings are cosine rankings whatever the collection's
+    distance and whichever Ollama endpoint produced the vector.
+    """
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def projection_path(name: str) -> Path:
+    """Where the ingest-time projection for a collection is kept, next to its index."""
+    index_dir = CHROMA_DIR if USE_CHROMADB else Path(VECTOR_STORE_DIR).resolve()
+    return index_dir / f"{name}.projection.npz"
+
 
 # Use a simple module-level cache to reuse the same client across imports
 _CLIENT = None
 _CLIENT_LOCK = threading.Lock()
 
 
-if _HAS_CHROMADB:
+if USE_CHROMADB:
     def get_client() -> chromadb.PersistentClient:
         global _CLIENT
         if _CLIENT is None:
@@ -34,7 +67,8 @@ if _HAS_CHROMADB:
 
     def get_collection(name: str):
         client = get_client()
-        return client.get_or_create_collection(name)
+        # only applies when the collection is created
+        return client.get_or_create_collection(name, metadata={"hnsw:space": "cosine"})
 
 
     def persist():
@@ -44,60 +78,21 @@ if _HAS_CHROMADB:
             pass
 
 else:
-    # Minimal in-memory fallback mimicking the Chroma API surface used in this project
-    class _InMemoryCollection:
-        def __init__(self, name: str):
-            self.name = name
-            self._documents = []
-            self._metadatas = []
-            self._embeddings = []
-            self._ids = []
-
-        def add(self, *, documents=None, metadatas=None, embeddings=None, ids=None, **kwargs):
-            documents = documents or []
-            metadatas = metadatas or [None] * len(documents)
-            embeddings = embeddings or [None] * len(documents)
-            ids = ids or [None] * len(documents)
-            for d, m, e, i in zip(documents, metadatas, embeddings, ids):
-                self._documents.append(d)
-                self._metadatas.append(m)
-                self._embeddings.append(e)
-                self._ids.append(i)
-
-        def count(self):
-            return len(self._documents)
-
-        def peek(self, limit: int = 5):
-            return {"documents": self._documents[:limit]}
-
-        def query(self, *, query_embeddings=None, query_texts=None, n_results=3, **kwargs):
-            # naive similarity: return first n_results documents
-            docs = self._documents[:n_results]
-            return {"documents": [docs], "metadatas": [self._metadatas[:n_results]]}
-
-
-    class _InMemoryClient:
-        def __init__(self):
-            self._collections = {}
-
-        def get_or_create_collection(self, name: str):
-            if name not in self._collections:
-                self._collections[name] = _InMemoryCollection(name)
-            return self._collections[name]
-
-        def persist(self):
-            return None
-
-
-    _IN_MEMORY_CLIENT = _InMemoryClient()
-
-
-    def get_client():
-        return _IN_MEMORY_CLIENT
+    def get_client() -> NumpyVectorClient:
+        global _CLIENT
+        if _CLIENT is None:
+            with _CLIENT_LOCK:
+                if _CLIENT is None:
+                    _CLIENT = NumpyVectorClient(
+                        Path(VECTOR_STORE_DIR).resolve(),
+                        quantization=VECTOR_QUANTIZATION,
+                        rescore_factor=VECTOR_RESCORE_FACTOR,
+                    )
+        return _CLIENT
 
 
     def get_collection(name: str):
-        return _IN_MEMORY_CLIENT.get_or_create_collection(name)
+        return get_client().get_or_create_collection(name)
 
 
     def persist():
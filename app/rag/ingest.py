@@ -1,4 +1,6 @@
 from pathlib import Path
+import csv
+import json
 import sys
 from pypdf import PdfReader
 
@@ -10,12 +12,26 @@ if str(ROOT) not in sys.path:
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-import ollama
 
-from app.rag.chroma_client import get_collection, persist
+from app.canonicalize import canonical_text
+from app.config import VECTOR_PROJECTION, VECTOR_PROJECTION_DIM
+from app.inference_scheduler import Priority
+from app.llm import embed_batch
+from app.phrase_matcher import PhraseMatcher
+from app.rag.chroma_client import get_collection, persist, projection_path, unit_vector
+from app.rag.projection import Projection, recall_at_k, write_report
 
 
 DATA_DIR = Path("data/policies")
+# Sample queries for the projection recall report
+EVAL_QUESTIONS = Path("evaluation/questions.csv")
+
+# Chunk topic tags; when several match, the first group listed wins
+TOPIC_PHRASES = PhraseMatcher({
+    "damage": ["damage", "damaged", "defective"],
+    "refund": ["refund"],
+    "return": ["return"],
+})
 
 
 def load_pdfs():
@@ -45,12 +61,51 @@ def load_pdfs():
 
 
 
-def embed_texts(texts, model="llama3.1"):
+def embed_texts(texts, model=None, batch_size=32):
+    # model=None uses the "embed" inference profile (EMBED_MODEL), which is
+    # also what retrieve_context_async embeds queries with
     embeddings = []
-    for text in texts:
-        response = ollama.embeddings(model=model, prompt=text)
-        embeddings.append(response["embedding"])
-    return embeddings
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        embeddings.extend(embed_batch(batch, model=model, priority=Priority.BULK))
+    return [unit_vector(e) for e in embeddings]
+
+
+def fit_projection(embeddings, name: str):
+    """
+    Fit the configured projection on the chunk embeddings, save it next to
+    the index and report recall@k of reduced against full-dimension search,
+    using the evaluation questions and the chunks themselves as queries.
+    Returns the reduced vectors to store, or the input when disabled.
+    """
+    path = projection_path(name)
+    if VECTOR_PROJECTION == "none":
+        # a leftover projection would be applied to queries against full vectors
+        path.unlink(missing_ok=True)
+        return embeddings
+
+    projection = Projection.fit(embeddings, VECTOR_PROJECTION_DIM, method=VECTOR_PROJECTION)
+
+    report = {
+        "method": projection.method,
+        "full_dim": projection.full_dim,
+        "dim": projection.dim,
+        "chunks": len(embeddings),
+        "chunk_queries": recall_at_k(embeddings, embeddings, projection, exclude_self=True),
+    }
+    if EVAL_QUESTIONS.exists():
+        with open(EVAL_QUESTIONS, newline="", encoding="utf-8") as f:
+            questions = [canonical_text(row["query"]) for row in csv.DictReader(f) if row.get("query")]
+        if questions:
+            query_embeddings = embed_texts(questions)
+            report["eval_queries"] = recall_at_k(embeddings, query_embeddings, projection)
+
+    projection.save(path)
+    write_report(path.with_suffix(".json"), report)
+    print(f"Projection report ({path.with_suffix('.json')}):")
+    print(json.dumps(report, indent=2))
+
+    return projection.apply(embeddings).tolist()
 
 
 def ingest():
@@ -70,23 +125,28 @@ def ingest():
     chunks = splitter.split_documents(docs)
 
     for chunk in chunks:
-        text = chunk.page_content.lower()
-
-        if "return" in text:
-            chunk.metadata["topic"] = "return"
-        if "refund" in text:
-            chunk.metadata["topic"] = "refund"
-        if "damage" in text or "damaged" in text or "defective" in text:
-            chunk.metadata["topic"] = "damage"
+        topic = TOPIC_PHRASES.first_label(chunk.page_content)
+        if topic:
+            chunk.metadata["topic"] = topic
 
         chunk.metadata["doc_type"] = "policy"
 
 
     collection = get_collection("policies")
 
+    # ids that already exist are skipped by add(), so vectors left from an
+    # earlier ingest would stay in the old space while queries use the new
+    # projection (possibly of another dimension)
+    existing = collection.count()
+    if existing and (VECTOR_PROJECTION != "none" or projection_path("policies").exists()):
+        raise RuntimeError(
+            f"Collection 'policies' already holds {existing} vectors; delete the vector store "
+            f"and re-ingest to change or refit the embedding projection"
+        )
+
     texts = [chunk.page_content for chunk in chunks]
     metadatas = [chunk.metadata for chunk in chunks]
-    embeddings = embed_texts(texts)
+    embeddings = fit_projection(embed_texts(texts), "policies")
 
     ids = [f"doc_{i}" for i in range(len(texts))]
 
@@ -0,0 +1,139 @@
+"""
+Dimensionality reduction for stored embeddings, fitted at ingest time.
+
+"pca" keeps the top principal directions of the (uncentered) document
+embeddings, so dot products with anything inside the kept subspace are
+unchanged; "truncate" keeps the first `dim` coordinates, for models
+trained to front-load information (Matryoshka-style). Document vectors
+are stored reduced; queries are projected the same way before searching.
+Both sides are re-normalised, so search stays cosine.
+"""
+import json
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("pca", "truncate")
+
+# rows used to fit PCA; enough to pin down the leading directions
+FIT_SAMPLE_ROWS = 8192
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    return m / np.where(norms == 0, 1.0, norms)
+
+
+class Projection:
+    def __init__(self, method: str, full_dim: int, components: np.ndarray | None = None, dim: int | None = None):
+        if method not in METHODS:
+            raise ValueError(f"Unknown projection method {method!r} (expected one of {METHODS})")
+        self.method = method
+        self.full_dim = full_dim
+        self.components = None if components is None else components.astype(np.float32)
+        self.dim = components.shape[1] if components is not None else dim
+
+    @classmethod
+    def fit(cls, vectors, dim: int, method: str = "pca", seed: int = 0) -> "Projection":
+        if method not in METHODS:
+            raise ValueError(f"Unknown projection method {method!r} (expected one of {METHODS})")
+        x = np.asarray(vectors, dtype=np.float32)
+        full_dim = x.shape[1]
+        if dim >= full_dim:
+            raise ValueError(f"Projection dimension {dim} must be smaller than the embedding dimension {full_dim}")
+        if method == "truncate":
+            return cls("truncate", full_dim, dim=dim)
+
+        if len(x) > FIT_SAMPLE_ROWS:
+            x = x[np.random.default_rng(seed).choice(len(x), FIT_SAMPLE_ROWS, replace=False)]
+        # right singular vectors of the raw matrix; a corpus smaller than
+        # `dim` only has len(x) directions to keep
+        _, _, vt = np.linalg.svd(x, full_matrices=False)
+        kept = min(dim, vt.shape[0])
+        if kept < dim:
+            logger.warning("Only %d embeddings to fit a %d-d projection, keeping %d dimensions", len(x), dim, kept)
+        return cls("pca", full_dim, components=vt[:kept].T)
+
+    def apply(self, vectors) -> np.ndarray:
+        """Project and re-normalise (rows of) vectors."""
+        x = np.asarray(vectors, dtype=np.float32)
+        if x.shape[-1] != self.full_dim:
+            raise ValueError(f"Expected {self.full_dim}-d embeddings, got {x.shape[-1]}-d")
+        reduced = x[..., :self.dim] if self.method == "truncate" else x @ self.components
+        return _normalize(reduced)
+
+    def save(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {"method": np.asarray(self.method), "full_dim": np.asarray(self.full_dim), "dim": np.asarray(self.dim)}
+        if self.components is not None:
+            arrays["components"] = self.components
+        # np.savez appends .npz to names without it; write aside and swap in
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(tmp, **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "Projection":
+        data = np.load(path)
+        components = data["components"] if "components" in data.files else None
+        return cls(str(data["method"]), int(data["full_dim"]), components=components, dim=int(data["dim"]))
+
+
+def recall_at_k(docs, queries, projection: Projection, ks=(1, 5, 10), exclude_self: bool = False) -> dict:
+    """
+    Mean overlap between the top-k documents found with full-dimension and
+    with projected vectors, for each k. With exclude_self the queries are
+    the documents themselves and each one's own row is ignored.
+    """
+    docs = _normalize(np.asarray(docs, dtype=np.float32))
+    queries = _normalize(np.asarray(queries, dtype=np.float32))
+    full = queries @ docs.T
+    reduced = projection.apply(queries) @ projection.apply(docs).T
+    if exclude_self:
+        np.fill_diagonal(full, -np.inf)
+        np.fill_diagonal(reduced, -np.inf)
+
+    report = {}
+    for k in ks:
+        k_eff = min(k, docs.shape[0] - exclude_self)
+        if k_eff <= 0:
+            continue
+        top_full = np.argpartition(-full, k_eff - 1, axis=1)[:, :k_eff]
+        top_reduced = np.argpartition(-reduced, k_eff - 1, axis=1)[:, :k_eff]
+        overlap = [len(set(a) & set(b)) / k_eff for a, b in zip(top_full.tolist(), top_reduced.tolist())]
+        report[f"recall@{k}"] = round(float(np.mean(overlap)), 4)
+    return report
+
+
+def write_report(path: Path, report: dict):
+    Path(path).write_text(json.dumps(report, indent=2))
+
+
+# -------------------------
+# query side
+# -------------------------
+_CACHE: dict[str, tuple[int, Projection]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def get_projection(path: Path) -> Projection | None:
+    """The projection saved at `path`, reloaded when the file changes; None if there is none."""
+    path = Path(path)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    key = str(path)
+    cached = _CACHE.get(key)
+    if cached is None or cached[0] != mtime:
+        with _CACHE_LOCK:
+            cached = _CACHE.get(key)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, Projection.load(path))
+                _CACHE[key] = cached
+    return cached[1]
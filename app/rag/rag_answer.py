@@ -1,10 +1,14 @@
 import asyncio
 import logging
-import ollama
 
-from app.llm import get_llm
-from app.config import OLLAMA_MODEL
-from app.rag.chroma_client import get_collection
+from app.canonicalize import canonical_text
+from app.config import RETRIEVAL_BATCH_WAIT_MS, RETRIEVAL_BATCH_MAX, RETRIEVAL_BATCH_CONCURRENCY
+from app.llm import get_llm, embed, embed_batch, record_usage
+from app.inference_scheduler import Priority
+from app.micro_batcher import MicroBatcher
+from app.phrase_matcher import PhraseMatcher
+from app.rag.chroma_client import get_collection, projection_path, unit_vector
+from app.rag.projection import get_projection
 
 logger = logging.getLogger(__name__)
 
@@ -13,49 +17,112 @@ collection = get_collection("policies")
 
 
 # ------------------------------------------------
-# ASYNC: Retrieve context from Chroma
+# Micro-batched query embedding + Chroma search
 # ------------------------------------------------
-async def retrieve_context_async(query: str, k: int = 5) -> str:
+def _search_many(requests: list[tuple[list[float], int]]) -> list[list[str]]:
+    # one Chroma query for the whole batch, each request gets its own top-k
+    query_embeddings = [unit_vector(embedding) for embedding, _ in requests]
+    # stored vectors were reduced at ingest; reduce queries to match
+    projection = get_projection(projection_path("policies"))
+    if projection is not None:
+        query_embeddings = projection.apply(query_embeddings).tolist()
+    results = collection.query(
+        query_embeddings=query_embeddings,
+        n_results=max(k for _, k in requests),
+    )
+    documents = results.get("documents") or [[] for _ in requests]
+    return [docs[:k] for docs, (_, k) in zip(documents, requests)]
+
+
+if RETRIEVAL_BATCH_WAIT_MS > 0:
+    _EMBED_BATCHER = MicroBatcher(
+        lambda texts: embed_batch(texts, priority=Priority.RETRIEVAL),
+        max_batch=RETRIEVAL_BATCH_MAX,
+        max_wait_ms=RETRIEVAL_BATCH_WAIT_MS,
+        concurrency=RETRIEVAL_BATCH_CONCURRENCY,
+        name="query-embed",
+    )
+    _SEARCH_BATCHER = MicroBatcher(
+        _search_many,
+        max_batch=RETRIEVAL_BATCH_MAX,
+        max_wait_ms=RETRIEVAL_BATCH_WAIT_MS,
+        concurrency=RETRIEVAL_BATCH_CONCURRENCY,
+        name="chroma-search",
+    )
+else:
+    _EMBED_BATCHER = _SEARCH_BATCHER = None
+
+
+def embed_query_text(text: str) -> list[float]:
+    """Embed a (canonical) query, batched with concurrent requests."""
+    if _EMBED_BATCHER is None:
+        return embed(text)
+    embedding = _EMBED_BATCHER.submit(text)
+    # the batch ran on the batcher's thread; count it for this caller, as
+    # embed() would
+    record_usage(embed=True)
+    return embedding
+
+
+def search(query_embedding: list[float], k: int = 5) -> list[str]:
+    """Top-k documents for a query embedding, batched with concurrent requests."""
+    if _SEARCH_BATCHER is None:
+        return _search_many([(query_embedding, k)])[0]
+    return _SEARCH_BATCHER.submit((query_embedding, k))
+
+
+def batching_stats() -> dict:
+    if _EMBED_BATCHER is None:
+        return {"enabled": False}
+    return {"enabled": True, "embed": _EMBED_BATCHER.stats(), "search": _SEARCH_BATCHER.stats()}
+
+
+# ------------------------------------------------
+# Retrieve context from Chroma
+# ------------------------------------------------
+def retrieve_context(query: str, k: int = 5, embed_query=None) -> str:
     """
-    Async wrapper around embedding + Chroma query.
-    Runs blocking IO in a thread executor.
+    Blocking embedding + Chroma query.
+    embed_query: optional zero-arg callable returning the query embedding,
+    to share one computed (or memoized) elsewhere.
     """
-    loop = asyncio.get_running_loop()
-
-    def _embed_and_query():
-        try:
-            # Compute embedding via Ollama
-            embedding = ollama.embeddings(
-                model=OLLAMA_MODEL,
-                prompt=query,
-           )["embedding"]
+    try:
+        # Compute embedding via the pooled Ollama client
+        query_embedding = embed_query() if embed_query else embed_query_text(canonical_text(query))
 
-            results = collection.query(
-                query_embeddings=[embedding],
-                n_results=k,
-            )
+        # Log a compact preview of retrieved chunks for debugging
+        docs = search(query_embedding, k)
+        logger.debug("Retrieved %d chunks for query", len(docs))
+        for d in docs:
+            preview = (d[:120] + "...") if len(d) > 120 else d
+            logger.debug("- %s", preview.replace("\n", " "))
 
-            # Log a compact preview of retrieved chunks for debugging
-            docs = results.get("documents", [[]])[0]
-            logger.debug("Retrieved %d chunks for query", len(docs))
-            for d in docs:
-                preview = (d[:120] + "...") if len(d) > 120 else d
-                logger.debug("- %s", preview.replace("\n", " "))
+        return "\n\n".join(docs)
+    except Exception as e:
+        logger.exception("Error during embedding or Chroma query")
+        # Return empty context so downstream code can handle gracefully
+        return ""
 
-            return "\n\n".join(docs)
-        except Exception as e:
-            logger.exception("Error during embedding or Chroma query")
-            # Return empty context so downstream code can handle gracefully
-            return ""
 
-    return await loop.run_in_executor(None, _embed_and_query)
+async def retrieve_context_async(query: str, k: int = 5, embed_query=None) -> str:
+    """
+    Async wrapper around retrieve_context.
+    Runs blocking IO in a thread executor.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: retrieve_context(query, k=k, embed_query=embed_query))
 
 
 # ------------------------------------------------
 # ASYNC: Generate grounded answer
 # ------------------------------------------------
-async def answer_question_async(query: str) -> dict:
-    context = await retrieve_context_async(query)
+async def answer_question_async(query: str, embed_query=None, context: str | None = None) -> dict:
+    """
+    context: already retrieved context (e.g. fetched speculatively while the
+    intent was being classified); retrieval is skipped when given.
+    """
+    if context is None:
+        context = await retrieve_context_async(query, embed_query=embed_query)
 
     prompt = f"""
 You are a customer support assistant.
@@ -77,13 +144,13 @@ Question:
 {query}
 """
 
-    llm = get_llm()
+    llm = get_llm("answer")
     loop = asyncio.get_running_loop()
 
     try:
         response = await loop.run_in_executor(
             None,
-            lambda: llm.invoke(prompt)
+            lambda: llm.invoke(prompt, priority=Priority.GENERATION)
         )
 
         answer = response.content.strip()
@@ -107,17 +174,26 @@ Question:
 # ------------------------------------------------
 # SYNC WRAPPER (Backwards compatible)
 # ------------------------------------------------
-def answer_question(query: str) -> dict:
+def answer_question(query: str, embed_query=None, context: str | None = None) -> dict:
     """
     Sync wrapper so existing code does NOT break.
     """
-    return asyncio.run(answer_question_async(query))
+    return asyncio.run(answer_question_async(query, embed_query=embed_query, context=context))
 
 
 # ------------------------------------------------
 # Confidence helper (unchanged)
 # ------------------------------------------------
 
+REFUSAL_PHRASES = PhraseMatcher([
+    "i don't have enough information",
+    "i am not sure",
+    "i'm not sure",
+    "cannot determine",
+    "insufficient information",
+])
+
+
 def is_weak_answer(answer: str) -> bool:
     """
     Returns True ONLY when the model explicitly refuses
@@ -126,13 +202,4 @@ def is_weak_answer(answer: str) -> bool:
     if not answer or not answer.strip():
         return True
 
-    refusal_phrases = [
-        "i don't have enough information",
-        "i am not sure",
-        "i'm not sure",
-        "cannot determine",
-        "insufficient information",
-    ]
-
-    answer_lower = answer.lower()
-    return any(p in answer_lower for p in refusal_phrases)
+    return REFUSAL_PHRASES.search(answer)
@@ -0,0 +1,380 @@
+"""
+Exact vector store on NumPy memory maps, with the subset of the Chroma
+collection API this project uses (add / query / count / peek, and
+equality-only `where` metadata filters).
+
+On-disk layout of a collection directory:
+
+    meta.json         {"dim": d, "count": n}, rewritten last on every add
+    embeddings.f32    n x d float32, unit-length rows
+    ids.npy           n ids
+    records.jsonl     one {"document", "metadata"} line per row
+    offsets.npy       n + 1 byte offsets into records.jsonl
+
+The embedding matrix is memory-mapped read-only, so any number of worker
+processes share one copy through the page cache. A query is a single
+matrix product plus argpartition; only the top-k records are read.
+
+With quantization="int8" or "float16" a compact copy of the matrix is kept
+next to it (embeddings.i8 + scales.f32, or embeddings.f16) and scanned
+instead; the best k * rescore_factor candidates are then rescored exactly
+against their float32 rows, so only those rows of the full matrix are read.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    return m / np.where(norms == 0, 1.0, norms)
+
+
+QUANTIZATIONS = ("none", "int8", "float16")
+
+# rows per block when scanning a quantized matrix; small blocks keep the
+# float32 temporary in CPU cache
+SCAN_BLOCK_ROWS = 1024
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8: codes * scale ~= vector."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def _matches(metadata: dict | None, where: dict) -> bool:
+    """Chroma-style metadata filter, equality only: {"k": v}, {"k": {"$eq": v}}, {"$and": [...]}."""
+    metadata = metadata or {}
+    for key, expected in where.items():
+        if key == "$and":
+            if not all(_matches(metadata, clause) for clause in expected):
+                return False
+            continue
+        if isinstance(expected, dict):
+            if set(expected) != {"$eq"}:
+                raise ValueError(f"Unsupported metadata filter {expected!r}; only equality is supported")
+            expected = expected["$eq"]
+        if metadata.get(key) != expected:
+            return False
+    return True
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores per row, best first."""
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, idx, axis=-1), axis=-1)
+    return np.take_along_axis(idx, order, axis=-1)
+
+
+class NumpyCollection:
+    def __init__(self, name: str, path: Path, quantization: str = "none", rescore_factor: int = 4):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization {quantization!r} (expected one of {QUANTIZATIONS})")
+        self.name = name
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+        self._codes: np.ndarray | None = None
+        self._scales: np.ndarray | None = None
+
+        self.dim = 0
+        self._count = 0
+        self._matrix: np.ndarray | None = None
+        self._ids: np.ndarray = np.empty(0, dtype=str)
+        self._offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        self._id_set: set[str] = set()
+        self._metadatas: list | None = None
+        self._meta_mtime = None
+        self._lock = threading.RLock()
+        self._load()
+
+    # -------------------------
+    # files
+    # -------------------------
+    @property
+    def _meta_path(self) -> Path:
+        return self.path / "meta.json"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.path / "embeddings.f32"
+
+    @property
+    def _records_path(self) -> Path:
+        return self.path / "records.jsonl"
+
+    @property
+    def _codes_path(self) -> Path:
+        return self.path / ("embeddings.i8" if self.quantization == "int8" else "embeddings.f16")
+
+    @property
+    def _scales_path(self) -> Path:
+        return self.path / "scales.f32"
+
+    def _encode(self, vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
+        if self.quantization == "int8":
+            return quantize_int8(vectors)
+        return vectors.astype(np.float16), None
+
+    def _write_codes(self, start: int, vectors: np.ndarray, codes_path: Path | None = None, scales_path: Path | None = None):
+        codes, scales = self._encode(vectors)
+        with open(codes_path or self._codes_path, "ab") as f:
+            f.truncate(start * self.dim * codes.itemsize)
+            f.write(codes.tobytes())
+        if scales is not None:
+            with open(scales_path or self._scales_path, "ab") as f:
+                f.truncate(start * 4)
+                f.write(scales.tobytes())
+
+    def _temp_path(self, target: Path) -> Path:
+        # unique per caller: several processes may rebuild the same copy
+        fd, name = tempfile.mkstemp(dir=self.path, prefix=f".{target.name}.", suffix=".tmp")
+        os.close(fd)
+        return Path(name)
+
+    def _sync_codes(self):
+        """(Re)build the quantized copy when it is missing or behind the float32 rows."""
+        if self.quantization == "none" or not self._count:
+            self._codes = self._scales = None
+            return
+
+        itemsize = 1 if self.quantization == "int8" else 2
+        have = self._codes_path.stat().st_size // (self.dim * itemsize) if self._codes_path.exists() else 0
+        if self.quantization == "int8" and self._scales_path.exists():
+            have = min(have, self._scales_path.stat().st_size // 4)
+        elif self.quantization == "int8":
+            have = 0
+
+        if have < self._count:
+            logger.info("Building %s copy of collection %s (%d rows)", self.quantization, self.name, self._count)
+            # written aside and swapped in, so concurrent readers never see a
+            # partial file; concurrent rebuilds produce identical files
+            codes_tmp = self._temp_path(self._codes_path)
+            scales_tmp = self._temp_path(self._scales_path) if self.quantization == "int8" else None
+            try:
+                for start in range(0, self._count, SCAN_BLOCK_ROWS):
+                    block = np.asarray(self._matrix[start:start + SCAN_BLOCK_ROWS])
+                    self._write_codes(start, block, codes_tmp, scales_tmp)
+                os.replace(codes_tmp, self._codes_path)
+                if scales_tmp is not None:
+                    os.replace(scales_tmp, self._scales_path)
+            finally:
+                for tmp in (codes_tmp, scales_tmp):
+                    if tmp is not None:
+                        tmp.unlink(missing_ok=True)
+
+        dtype = np.int8 if self.quantization == "int8" else np.float16
+        self._codes = np.memmap(self._codes_path, dtype=dtype, mode="r", shape=(self._count, self.dim))
+        self._scales = (
+            np.memmap(self._scales_path, dtype=np.float32, mode="r", shape=(self._count,))
+            if self.quantization == "int8" else None
+        )
+
+    def _load(self):
+        with self._lock:
+            if not self._meta_path.exists():
+                return
+            mtime = self._meta_path.stat().st_mtime_ns
+            if mtime == self._meta_mtime:
+                return
+            meta = json.loads(self._meta_path.read_text())
+            self.dim, self._count = meta["dim"], meta["count"]
+            self._meta_mtime = mtime
+
+            # files may run past `count` after an interrupted add; only the
+            # first `count` rows are trusted
+            self._matrix = (
+                np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(self._count, self.dim))
+                if self._count else None
+            )
+            self._ids = np.load(self.path / "ids.npy")[:self._count]
+            self._offsets = np.load(self.path / "offsets.npy")[:self._count + 1]
+            self._id_set = set(self._ids.tolist())
+            self._metadatas = None
+            self._sync_codes()
+
+    def _refresh(self):
+        # pick up rows added by another process
+        try:
+            if self._meta_path.stat().st_mtime_ns != self._meta_mtime:
+                self._load()
+        except FileNotFoundError:
+            pass
+
+    def _records(self, rows) -> list[dict]:
+        out = []
+        if not len(rows):
+            return out
+        with open(self._records_path, "rb") as f:
+            for i in rows:
+                start, end = self._offsets[i], self._offsets[i + 1]
+                f.seek(start)
+                out.append(json.loads(f.read(end - start)))
+        return out
+
+    def _filter_rows(self, where: dict) -> np.ndarray:
+        # all metadata is read once per load; filters are rare and small
+        if self._metadatas is None:
+            self._metadatas = [r["metadata"] for r in self._records(range(self._count))]
+        return np.asarray([i for i, m in enumerate(self._metadatas) if _matches(m, where)], dtype=np.int64)
+
+    # -------------------------
+    # Chroma-style API
+    # -------------------------
+    def add(self, *, ids=None, embeddings=None, documents=None, metadatas=None, **kwargs):
+        if embeddings is None:
+            raise ValueError("NumpyCollection.add needs embeddings")
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or not len(vectors):
+            return
+        documents = documents or [None] * len(vectors)
+        metadatas = metadatas or [None] * len(vectors)
+
+        with self._lock:
+            self._load()
+            base = self._count
+            ids = [str(i) for i in ids] if ids else [f"{self.name}_{base + n}" for n in range(len(vectors))]
+
+            if self.dim and vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match collection dimension {self.dim}")
+
+            # like Chroma, existing ids are left alone
+            keep = [n for n, i in enumerate(ids) if i not in self._id_set]
+            if len(keep) < len(ids):
+                logger.warning("Skipping %d existing ids in collection %s", len(ids) - len(keep), self.name)
+            if not keep:
+                return
+
+            vectors = _normalize(vectors[keep])
+            dim = vectors.shape[1]
+
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(base * dim * 4)
+                f.write(np.ascontiguousarray(vectors).tobytes())
+            if self.quantization != "none":
+                # _load() already brought the quantized copy up to `base` rows
+                self.dim = dim
+                self._write_codes(base, vectors)
+
+            offsets = list(self._offsets)
+            with open(self._records_path, "ab") as f:
+                f.truncate(offsets[-1])
+                for n in keep:
+                    line = (json.dumps({"document": documents[n], "metadata": metadatas[n]}, ensure_ascii=False) + "\n").encode("utf-8")
+                    f.write(line)
+                    offsets.append(offsets[-1] + len(line))
+
+            np.save(self.path / "ids.npy", np.concatenate([self._ids, np.asarray([ids[n] for n in keep])]))
+            np.save(self.path / "offsets.npy", np.asarray(offsets, dtype=np.int64))
+
+            tmp = self._meta_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"dim": dim, "count": base + len(keep)}))
+            os.replace(tmp, self._meta_path)
+            self._meta_mtime = None
+            self._load()
+
+    def count(self) -> int:
+        self._refresh()
+        return self._count
+
+    def peek(self, limit: int = 10) -> dict:
+        self._refresh()
+        rows = range(min(limit, self._count))
+        records = self._records(rows)
+        return {
+            "ids": self._ids[:len(rows)].tolist(),
+            "embeddings": self._matrix[:len(rows)].tolist() if self._matrix is not None else [],
+            "documents": [r["document"] for r in records],
+            "metadatas": [r["metadata"] for r in records],
+        }
+
+    def query(self, *, query_embeddings=None, n_results: int = 10, where=None, **kwargs) -> dict:
+        if query_embeddings is None:
+            raise ValueError("NumpyCollection.query needs query_embeddings")
+
+        self._refresh()
+        queries = _normalize(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        if self._matrix is None:
+            for key in result:
+                result[key] = [[] for _ in queries]
+            return result
+
+        if where:
+            # exact scores over the matching rows only
+            rows = self._filter_rows(where)
+            scores = (self._matrix[rows] @ queries.T).T
+            hits = [(rows[best], row_scores[best]) for row_scores, best in zip(scores, top_k(scores, n_results))]
+        elif self._codes is None:
+            # (n, d) @ (d, q): one pass over the matrix for every query
+            scores = (self._matrix @ queries.T).T
+            hits = [(rows, row_scores[rows]) for row_scores, rows in zip(scores, top_k(scores, n_results))]
+        else:
+            hits = self._coarse_then_rescore(queries, n_results)
+
+        for rows, row_scores in hits:
+            records = self._records(rows)
+            result["ids"].append(self._ids[rows].tolist())
+            result["documents"].append([r["document"] for r in records])
+            result["metadatas"].append([r["metadata"] for r in records])
+            result["distances"].append((1.0 - row_scores).tolist())
+        return result
+
+    def _coarse_then_rescore(self, queries: np.ndarray, k: int) -> list[tuple[np.ndarray, np.ndarray]]:
+        # coarse scores from the compact matrix, scanned in blocks
+        coarse = np.empty((len(queries), self._count), dtype=np.float32)
+        for start in range(0, self._count, SCAN_BLOCK_ROWS):
+            block = self._codes[start:start + SCAN_BLOCK_ROWS].astype(np.float32)
+            scores = queries @ block.T
+            if self._scales is not None:
+                scores *= self._scales[start:start + SCAN_BLOCK_ROWS]
+            coarse[:, start:start + len(block)] = scores
+
+        hits = []
+        for q, candidates in zip(queries, top_k(coarse, k * self.rescore_factor)):
+            # exact scores for the candidates only, read in file order
+            candidates = np.sort(candidates)
+            exact = self._matrix[candidates] @ q
+            best = top_k(exact, k)
+            hits.append((candidates[best], exact[best]))
+        return hits
+
+
+class NumpyVectorClient:
+    """Directory of NumpyCollections, shaped like a Chroma client."""
+
+    def __init__(self, path: Path, quantization: str = "none", rescore_factor: int = 4):
+        self.path = Path(path)
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+        self._collections: dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+
+    def get_or_create_collection(self, name: str, metadata=None, **kwargs) -> NumpyCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = NumpyCollection(
+                    name,
+                    self.path / name,
+                    quantization=self.quantization,
+                    rescore_factor=self.rescore_factor,
+                )
+            return self._collections[name]
+
+    def persist(self):
+        # every add is already on disk
+        return None
@@ -1,10 +1,49 @@
+import functools
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
 from langsmith import traceable
 
-from app.intent_schema import IntentLabel
-from app.intent_classifier import classify_intent
-from app.rag.rag_answer import answer_question
+from app.canonicalize import canonicalize
+from app.config import (
+    LOCAL_CLASSIFIER_ENABLED,
+    LOCAL_CLASSIFIER_THRESHOLD,
+    SPECULATIVE_RETRIEVAL,
+    SPECULATIVE_RETRIEVAL_WORKERS,
+)
+from app.intent_schema import IntentLabel, IntentResult
+from app.phrase_matcher import PhraseMatcher
+from app.intent_strategies import classify_intent_with_shadow
+from app.local_intent_classifier import classify_intent_local
+from app.rag.rag_answer import answer_question, embed_query_text, retrieve_context
+from app.sentiment import score_sentiment
 from app.tools.order_lookup import lookup_order
 
+REFUND_QUESTION_STARTERS = PhraseMatcher([
+    "can i",
+    "can we",
+    "am i",
+    "is it",
+    "do i",
+    "what is",
+    "how do",
+    "how can",
+    "does",
+])
+
+REFUND_ACTION_PHRASES = PhraseMatcher([
+    "i want",
+    "i need",
+    "process",
+    "initiate",
+    "request",
+    "apply",
+    "refund my",
+    "give me a refund",
+])
+
+
 def is_refund_question(query: str) -> bool:
     """
     Decide whether a refund-related query is a QUESTION (policy info)
@@ -12,40 +51,74 @@ def is_refund_question(query: str) -> bool:
     """
     q = query.lower().strip()
 
-    question_starters = [
-        "can i",
-        "can we",
-        "am i",
-        "is it",
-        "do i",
-        "what is",
-        "how do",
-        "how can",
-        "does",
-    ]
-
-    action_phrases = [
-        "i want",
-        "i need",
-        "process",
-        "initiate",
-        "request",
-        "apply",
-        "refund my",
-        "give me a refund",
-    ]
-
     # Explicit action → NOT a question
-    if any(p in q for p in action_phrases):
+    if REFUND_ACTION_PHRASES.search(q):
         return False
 
     # Explicit question → question
-    if any(q.startswith(p) for p in question_starters):
+    if REFUND_QUESTION_STARTERS.startswith(q):
         return True
 
     # Default: treat ambiguous refund queries as questions first
     return True
 
+# -------------------------
+# Speculative retrieval
+# -------------------------
+_SPECULATION_POOL = (
+    ThreadPoolExecutor(max_workers=SPECULATIVE_RETRIEVAL_WORKERS, thread_name_prefix="speculative-rag")
+    if SPECULATIVE_RETRIEVAL else None
+)
+_SPECULATION_STATS = Counter()
+_SPECULATION_LOCK = threading.Lock()
+
+
+def _count(event: str):
+    with _SPECULATION_LOCK:
+        _SPECULATION_STATS[event] += 1
+
+
+def _needs_retrieval(intent: IntentLabel, canonical_query: str) -> bool:
+    # policy questions and refund questions are answered from the policies
+    refund_question = intent == IntentLabel.REFUND and is_refund_question(canonical_query)
+    return intent == IntentLabel.POLICY or refund_question
+
+
+def _speculate(query: str, canonical_query: str, embed_query) -> Future | None:
+    if _SPECULATION_POOL is None:
+        return None
+    # the local classifier settles order-status, refund-action and greeting
+    # turns in microseconds; no point retrieving for those
+    if LOCAL_CLASSIFIER_ENABLED:
+        local = classify_intent_local(canonical_query)
+        if local.confidence >= LOCAL_CLASSIFIER_THRESHOLD and not _needs_retrieval(local.intent, canonical_query):
+            _count("skipped")
+            return None
+    _count("started")
+    return _SPECULATION_POOL.submit(retrieve_context, query, embed_query=embed_query)
+
+
+def _speculative_context(future: Future | None) -> str | None:
+    # None makes answer_question retrieve as usual
+    if future is None:
+        return None
+    _count("used")
+    return future.result()
+
+
+def _discard(future: Future | None):
+    if future is not None:
+        # a retrieval that already started just runs to completion unused
+        _count("cancelled" if future.cancel() else "discarded")
+
+
+def speculation_stats() -> dict:
+    with _SPECULATION_LOCK:
+        stats = {k: _SPECULATION_STATS[k] for k in ("started", "skipped", "used", "discarded", "cancelled")}
+    stats["enabled"] = _SPECULATION_POOL is not None
+    return stats
+
+
 @traceable(name="route_query")
 def route_query(query: str, extra_context: str | None = None) -> dict:
 
@@ -54,18 +127,53 @@ def route_query(query: str, extra_context: str | None = None) -> dict:
     Returns a unified response schema for UI + API.
     """
 
-    intent_result = classify_intent(query)
+    # --------------------------------------------------
+    # 0️⃣ ANGRY CUSTOMER → escalate before any model call
+    # --------------------------------------------------
+    sentiment = score_sentiment(query)
+    if sentiment.escalate:
+        return {
+            "final_answer": (
+                "I'm sorry about your experience. "
+                "I'm passing this to a human support agent right away."
+            ),
+            "intent": IntentResult(
+                intent=IntentLabel.OTHER,
+                confidence=sentiment.score,
+                reason=f"Escalated on sentiment ({', '.join(sentiment.cues)})",
+            ),
+            "confidence": sentiment.score,
+            "decision": "sentiment_escalation",
+            "escalate": True,
+        }
+
+    # Classification, embedding and their caches all see the canonical
+    # text; order ids are masked there and kept on the side for lookup
+    canonical = canonicalize(query)
+
+    # Embedded lazily and at most once per turn: shared by the embedding
+    # intent classifier and policy retrieval
+    query_embedding = functools.cache(lambda: embed_query_text(canonical.text))
+
+    # Retrieval for a likely policy answer starts now and overlaps with
+    # classification; it is only used if the intent turns out to need it
+    speculative = _speculate(query, canonical.text, query_embedding)
+
+    intent_result = classify_intent_with_shadow(canonical.text, embed_query=query_embedding)
 
     intent = intent_result.intent
     confidence = intent_result.confidence
     reason = intent_result.reason
 
+    if not _needs_retrieval(intent, canonical.text):
+        _discard(speculative)
+
     # --------------------------------------------------
     # 1️⃣ POLICY QUESTIONS (highest priority)
     # --------------------------------------------------
     if intent == IntentLabel.POLICY:
 
-        rag_result = answer_question(query)
+        rag_result = answer_question(query, embed_query=query_embedding, context=_speculative_context(speculative))
 
         answer = rag_result["answer"]
         is_weak = rag_result.get("is_weak", False)
@@ -100,7 +208,7 @@ def route_query(query: str, extra_context: str | None = None) -> dict:
     # --------------------------------------------------
     if intent == IntentLabel.ORDER_STATUS:
 
-        order_id = next((w for w in query.split() if w.startswith("ORD")), None)
+        order_id = canonical.order_id
 
         if not order_id:
             return {
@@ -123,8 +231,8 @@ def route_query(query: str, extra_context: str | None = None) -> dict:
     if intent == IntentLabel.REFUND:
 
         # 🟢 Refund-related QUESTION → try POLICY RAG first
-        if is_refund_question(query):
-            rag_result = answer_question(query)
+        if is_refund_question(canonical.text):
+            rag_result = answer_question(query, embed_query=query_embedding, context=_speculative_context(speculative))
 
             answer = rag_result["answer"]
             is_weak = rag_result.get("is_weak", False)
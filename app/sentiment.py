@@ -0,0 +1,118 @@
+import re
+from dataclasses import dataclass
+
+from app.config import ESCALATION_SENTIMENT, SENTIMENT_ANGER_THRESHOLD
+from app.phrase_matcher import PhraseMatcher
+
+# -------------------------
+# Lexicon
+# -------------------------
+# Weights are additive; a single strong cue is enough to escalate on its own
+STRONG_ANGER = [
+    "furious", "livid", "outraged", "enraged", "infuriating", "angry",
+    "pissed", "fuming", "sick of", "fed up", "had enough", "last straw",
+    "scam", "scammed", "fraud", "rip off", "ripoff", "ripped off", "stealing",
+    "lawyer", "legal action", "sue you", "suing", "report you", "chargeback",
+    "worst service", "worst company", "never again", "never ordering",
+    "unacceptable", "disgusting", "pathetic", "incompetent", "ridiculous",
+]
+MILD_ANGER = [
+    "terrible", "horrible", "awful", "useless", "annoyed", "annoying",
+    "frustrated", "frustrating", "upset", "disappointed", "disappointing",
+    "waste of", "still waiting", "nobody", "no one", "again and again",
+    "complaint", "complain", "rude", "joke", "hate", "worst",
+]
+NEGATORS = {"not", "no", "never", "isn't", "wasn't", "aren't", "don't", "didn't", "nothing"}
+# a negator this many words before a phrase, in the same clause, cancels it
+# ("not at all angry")
+NEGATION_WINDOW = 3
+
+WEIGHTS = {"strong": 1.0, "mild": 0.5}
+SHOUTING_WEIGHT = 0.25
+EXCLAIM_WEIGHT = 0.25
+
+# phrases are padded with spaces and matched against the padded word
+# sequence, so "sue" can't fire inside "issue"
+ANGER_LEXICON = PhraseMatcher({
+    "strong": [f" {p} " for p in STRONG_ANGER],
+    "mild": [f" {p} " for p in MILD_ANGER],
+})
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+CLAUSE_RE = re.compile(r"[.,;:!?()]+|\bbut\b")
+CAPS_WORD_RE = re.compile(r"\b[A-Z]{2,}\b")
+LETTER_WORD_RE = re.compile(r"\b[A-Za-z]{2,}\b")
+# all-caps words shorter than this are mostly acronyms (FAQ, USA, ASAP) and
+# only count as shouting when most of the message is in caps
+SHOUT_MIN_LEN = 5
+
+
+@dataclass(frozen=True)
+class SentimentResult:
+    label: str
+    score: float
+    cues: tuple[str, ...] = ()
+
+    @property
+    def escalate(self) -> bool:
+        return self.label == ESCALATION_SENTIMENT
+
+
+def _anger_cues(clause: str) -> list[tuple[str, str]]:
+    """(phrase, label) of the non-negated anger phrases in one clause."""
+    padded = f" {' '.join(WORD_RE.findall(clause))} "
+    # longest first, so "worst service" claims its words before "worst"
+    matches = sorted(ANGER_LEXICON.iter_matches(padded), key=lambda m: (m.start - m.end, m.start))
+    taken = []
+    cues = []
+    for match in matches:
+        # spans share their padding spaces with neighbours; compare the words
+        start, end = match.start + 1, match.end - 1
+        if any(start < e and s < end for s, e in taken):
+            continue
+        taken.append((start, end))
+        before = padded[:start].split()[-NEGATION_WINDOW:]
+        if not NEGATORS.intersection(before):
+            cues.append((match.phrase.strip(), match.label))
+    return cues
+
+
+def _shouting(text: str) -> bool:
+    caps = CAPS_WORD_RE.findall(text)
+    if sum(len(w) >= SHOUT_MIN_LEN for w in caps) >= 2:
+        return True
+    words = LETTER_WORD_RE.findall(text)
+    return len(caps) >= 3 and len(caps) >= 0.6 * len(words)
+
+
+def score_sentiment(text: str) -> SentimentResult:
+    """
+    Lexicon-based anger score in [0, 1]: weighted anger phrases (each
+    counted once, skipping ones negated earlier in their clause), plus
+    shouting and repeated "!". Labelled "angry" at
+    SENTIMENT_ANGER_THRESHOLD, "negative" below that when any cue fired,
+    else "neutral". Pure CPU, no model calls.
+    """
+    found = {}
+    for clause in CLAUSE_RE.split(text.casefold()):
+        for phrase, label in _anger_cues(clause):
+            found.setdefault(phrase, label)
+
+    score = sum((WEIGHTS[label] for label in found.values()), 0.0)
+    cues = list(found)
+
+    if _shouting(text):
+        score += SHOUTING_WEIGHT
+        cues.append("shouting")
+    if "!!" in text:
+        score += EXCLAIM_WEIGHT
+        cues.append("!!")
+
+    score = round(min(score, 1.0), 3)
+    if score >= SENTIMENT_ANGER_THRESHOLD:
+        label = "angry"
+    elif score > 0:
+        label = "negative"
+    else:
+        label = "neutral"
+    return SentimentResult(label=label, score=score, cues=tuple(cues))
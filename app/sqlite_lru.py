@@ -0,0 +1,208 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+
+# Hit recency is written in batches of this many keys (or with the next
+# set), not one UPDATE + commit per hit
+TOUCH_BATCH = 64
+# The row count is kept in memory; re-read every this many sets so rows
+# added by other workers are noticed
+RECOUNT_EVERY = 1000
+
+
+class SQLiteLRUCache:
+    """
+    Two-tier cache: a small in-process LRU for hot entries in front of an
+    optional SQLite table that survives restarts and is shared between
+    workers.
+
+    Values go through `encode` (to a str/bytes column value) on the way in
+    and `decode` on the way out; the in-process tier holds the encoded form,
+    so every get() returns a fresh object. ttl <= 0 disables expiry;
+    max_entries bounds the table, least recently used rows first. Recency
+    is approximate: hits are recorded in memory and written in batches.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        db_path: str | None,
+        ttl: float = 0,
+        max_entries: int = 10000,
+        memory_entries: int = 1024,
+        encode: Callable[[Any], str | bytes] = lambda v: v,
+        decode: Callable[[str | bytes], Any] = lambda v: v,
+    ):
+        self.table = table
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.encode = encode
+        self.decode = decode
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._memory: OrderedDict[str, tuple[float, str | bytes]] = OrderedDict()
+        self._touched: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self._conn = None
+        self._rows = 0
+        self._sets = 0
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._init_db()
+            self._rows = self._count_rows()
+
+    def _init_db(self):
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = [row[1] for row in self._conn.execute(f"PRAGMA table_info({self.table})")]
+        if columns and columns != ["key", "value", "created_at", "last_used"]:
+            # a table from an older layout; it is only a cache
+            self._conn.execute(f"DROP TABLE {self.table}")
+        self._conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {self.table} (
+            key TEXT PRIMARY KEY,
+            value BLOB,
+            created_at REAL,
+            last_used REAL
+        )
+        """)
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{self.table}_last_used ON {self.table} (last_used)"
+        )
+        self._conn.commit()
+
+    def _count_rows(self) -> int:
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return count
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    def _remember(self, key: str, created_at: float, stored):
+        self._memory[key] = (created_at, stored)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _touch(self, key: str, now: float):
+        if self._conn is None:
+            return
+        self._touched[key] = now
+        if len(self._touched) >= TOUCH_BATCH:
+            self._flush_touched()
+            self._conn.commit()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                f"UPDATE {self.table} SET last_used = ? WHERE key = ?",
+                [(t, k) for k, t in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, stored = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._touch(key, now)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return self.decode(stored)
+                del self._memory[key]
+
+            row = None
+            if self._conn is not None:
+                row = self._conn.execute(
+                    f"SELECT value, created_at FROM {self.table} WHERE key = ?",
+                    (key,)
+                ).fetchone()
+
+            if not row or self._expired(row[1], now):
+                if row:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self._rows -= 1
+                self.misses += 1
+                return None
+
+            stored, created_at = row
+            self._touch(key, now)
+            self._remember(key, created_at, stored)
+            self.hits += 1
+            return self.decode(stored)
+
+    def set(self, key: str, value):
+        now = time.time()
+        stored = self.encode(value)
+        with self._lock:
+            self._remember(key, now, stored)
+            if self._conn is None:
+                return
+            self._touched.pop(key, None)
+            inserted = self._conn.execute(f"""
+            INSERT OR IGNORE INTO {self.table} (key, value, created_at, last_used)
+            VALUES (?, ?, ?, ?)
+            """, (key, stored, now, now)).rowcount
+            if inserted:
+                self._rows += 1
+            else:
+                self._conn.execute(
+                    f"UPDATE {self.table} SET value = ?, created_at = ?, last_used = ? WHERE key = ?",
+                    (stored, now, now, key)
+                )
+            self._sets += 1
+            if self._sets % RECOUNT_EVERY == 0:
+                self._rows = self._count_rows()
+            self._flush_touched()
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        if self._rows <= self.max_entries:
+            return
+        # other workers share the table: recount before deleting
+        self._rows = self._count_rows()
+        overflow = self._rows - self.max_entries
+        if overflow > 0:
+            deleted = self._conn.execute(f"""
+            DELETE FROM {self.table} WHERE key IN (
+                SELECT key FROM {self.table} ORDER BY last_used LIMIT ?
+            )
+            """, (overflow,)).rowcount
+            self._rows -= deleted
+            self.evictions += deleted
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            if self._conn is not None:
+                self._conn.execute(f"DELETE FROM {self.table}")
+                self._conn.commit()
+                self._rows = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "persistent": self._conn is not None,
+        }
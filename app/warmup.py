@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import threading
+import time
+
+from app.cassette import get_cassette
+from app.config import WARMUP_ENABLED, WARMUP_RETRY_INTERVAL
+from app.inference_profiles import PROFILES
+from app.ollama_hosts import get_pool
+
+logger = logging.getLogger(__name__)
+
+# sent straight to the LLM classifier: the local fast path would settle it
+# without touching the chat model
+WARMUP_CLASSIFY_QUERY = "Where is my order ORD123?"
+WARMUP_RETRIEVAL_QUERY = "What is the return policy?"
+
+_READY = threading.Event()
+_STATUS = {
+    "state": "pending",
+    "attempts": 0,
+    "error": None,
+    "duration_s": None,
+}
+_STARTED = False
+_START_LOCK = threading.Lock()
+
+
+def _preload_host(host):
+    loaded = set()
+    for profile in PROFILES.values():
+        key = (profile.name == "embed", profile.model)
+        if key in loaded:
+            continue
+        loaded.add(key)
+
+        logger.info("Preloading %s on %s (%s)", profile.model, host.url, profile.name)
+        if profile.name == "embed":
+            host.client.embeddings(model=profile.model, prompt="", keep_alive=profile.keep_alive)
+        else:
+            host.client.chat(model=profile.model, messages=[], keep_alive=profile.keep_alive)
+
+
+def preload_models() -> int:
+    """
+    Load every profile's model on every Ollama host, with the profile's
+    keep_alive so it stays resident. An empty chat / empty embedding loads
+    the model without generating anything.
+
+    Hosts are preloaded independently: one that fails is logged and taken
+    out of rotation (the pool's health probe brings it back), and warmup
+    carries on as long as at least one host was warmed. Returns that count.
+    """
+    pool = get_pool()
+    warmed = 0
+    last_error = None
+    for host in pool.hosts:
+        try:
+            _preload_host(host)
+            warmed += 1
+        except Exception as e:
+            logger.warning("Preloading on Ollama host %s failed: %r", host.url, e)
+            pool.mark_unhealthy(host)
+            last_error = e
+    if not warmed:
+        raise RuntimeError(f"No Ollama host could be preloaded (last error: {last_error!r})")
+    return warmed
+
+
+def run_warmup():
+    """
+    Preload models, then run one LLM classification and one retrieval end to
+    end so every code path (clients, scheduler, Chroma) is hot.
+    """
+    # imported here so importing app.warmup stays cheap
+    from app.config import INTENT_CLASSIFIER_BACKEND
+    from app.embedding_intent_classifier import get_centroid_classifier
+    from app.llm import bypass_cache
+    from app.llm_intent_classifier import FEWSHOT as INTENT_FEWSHOT, classify_intent_llm
+    from app.llm_multi_intent_classifier import FEWSHOT as MULTI_INTENT_FEWSHOT
+    from app.rag.rag_answer import retrieve_context_async
+
+    preload_models()
+
+    # load (or build) the few-shot example indexes before the first request
+    for selector in (INTENT_FEWSHOT, MULTI_INTENT_FEWSHOT):
+        if selector.enabled:
+            selector.matrix()
+
+    # embedding backend: load (or build) the intent centroids now rather
+    # than embedding every exemplar inside the first request
+    if INTENT_CLASSIFIER_BACKEND == "embedding":
+        get_centroid_classifier()
+
+    # a cached answer from a previous run would leave the chat model idle
+    with bypass_cache():
+        classify_intent_llm(WARMUP_CLASSIFY_QUERY)
+    asyncio.run(retrieve_context_async(WARMUP_RETRIEVAL_QUERY))
+
+
+def _warmup_loop():
+    start = time.perf_counter()
+    while True:
+        _STATUS["attempts"] += 1
+        _STATUS["state"] = "warming_up"
+        try:
+            run_warmup()
+            break
+        except Exception as e:
+            logger.exception("Warmup failed, retrying in %ss", WARMUP_RETRY_INTERVAL)
+            _STATUS["error"] = str(e)
+            time.sleep(WARMUP_RETRY_INTERVAL)
+
+    _STATUS["state"] = "ready"
+    _STATUS["error"] = None
+    _STATUS["duration_s"] = round(time.perf_counter() - start, 3)
+    logger.info("Warmup finished in %ss", _STATUS["duration_s"])
+    _READY.set()
+
+
+def start_warmup():
+    """
+    Kick off warmup in a background thread (once per process). Retries until
+    Ollama answers; is_ready() stays False until it succeeds.
+    """
+    global _STARTED
+    with _START_LOCK:
+        if _STARTED:
+            return
+        _STARTED = True
+
+    cassette = get_cassette()
+    if not WARMUP_ENABLED or (cassette and cassette.replaying):
+        # nothing to warm when replaying a cassette
+        _STATUS["state"] = "ready"
+        _READY.set()
+        return
+
+    threading.Thread(
+        target=_warmup_loop,
+        name="warmup",
+        daemon=True,
+    ).start()
+
+
+def is_ready() -> bool:
+    return _READY.is_set()
+
+
+def warmup_status() -> dict:
+    return dict(_STATUS)
@@ -1,7 +1,12 @@
 import csv
 import requests
+import os
 import time
 
+# Pause between requests. Set EVAL_DELAY=0 when the API runs with
+# LLM_CASSETTE_MODE=replay (no live inference to protect).
+DELAY = float(os.getenv("EVAL_DELAY", 0.5))
+
 API_URL = "http://127.0.0.1:8000/query"
 THREAD_ID = "eval-thread"
 
@@ -44,7 +49,8 @@ with open(input_file, newline="", encoding="utf-8") as f:
             "escalate": data.get("escalate")
         })
 
-        time.sleep(0.5)  # avoid rate issues
+        if DELAY:
+            time.sleep(DELAY)  # be nice to a live local LLM; 0 when the API replays a cassette
 
 # Save results
 with open(output_file, "w", newline="", encoding="utf-8") as f:
@@ -0,0 +1,324 @@
+"""
+Deterministic stand-in for the subset of the Ollama HTTP API this project
+uses, for benchmarking and load-testing without any models.
+
+    python scripts/ollama_stub.py --port 11435 --profile cpu
+
+then point the app at it:
+
+    OLLAMA_BASE_URL=http://127.0.0.1:11435 uvicorn app.main:app
+
+Several instances on different ports can stand in for a multi-host setup
+(OLLAMA_BASE_URL=http://127.0.0.1:11435,http://127.0.0.1:11436).
+
+Endpoints: /api/chat (streaming or not, honours `format` and
+`options.num_predict`), /api/embeddings, /api/embed, /api/generate,
+/api/tags, /api/ps, /api/version.
+
+Answers are pure functions of the request:
+- intent-classification prompts get keyword-based JSON in the requested shape
+  (including numbered batch prompts)
+- RAG prompts ("Context: ... Question: ...") get the first context sentence
+- embeddings are hashed bag-of-words vectors, so similar texts are close
+The latency profile only adds sleeps: a prompt-eval delay proportional to
+input tokens, then a per-token generation delay.
+"""
+import argparse
+import hashlib
+import json
+import math
+import re
+import struct
+import sys
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# prompt tokens/s, generated tokens/s, fixed per-request overhead (s), embedding latency (s)
+PROFILES = {
+    "instant": {"prompt_tps": 0, "gen_tps": 0, "overhead": 0.0, "embed_latency": 0.0},
+    "gpu": {"prompt_tps": 2000, "gen_tps": 60, "overhead": 0.02, "embed_latency": 0.01},
+    "cpu": {"prompt_tps": 150, "gen_tps": 8, "overhead": 0.05, "embed_latency": 0.25},
+}
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def embed_text(text: str, dim: int) -> list[float]:
+    """Signed feature hashing of words and word bigrams, L2-normalised."""
+    vec = [0.0] * dim
+    words = WORD_RE.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for feat in features or [text]:
+        h = hashlib.blake2b(feat.encode("utf-8"), digest_size=8).digest()
+        idx, sign = struct.unpack("<IxxxB", h)
+        vec[idx % dim] += 1.0 if sign & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+# -------------------------
+# deterministic answers
+# -------------------------
+def classify_text(query: str) -> tuple[str, float, str]:
+    q = query.lower()
+    if "refund" in q or "money back" in q:
+        return "REFUND", 0.9, "Mentions refund"
+    if "return" in q or "policy" in q or "replace" in q or "exchange" in q:
+        return "POLICY", 0.88, "Asks about returns or policy"
+    if "order" in q or "track" in q or "where is" in q:
+        return "ORDER_STATUS", 0.85, "Asks about an order"
+    return "OTHER", 0.6, "No support intent detected"
+
+
+def _schema_properties(fmt) -> dict:
+    return fmt.get("properties", {}) if isinstance(fmt, dict) else {}
+
+
+def chat_answer(messages: list, fmt) -> str:
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system").lower()
+    user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    props = _schema_properties(fmt)
+
+    if "results" in props or '"results"' in system:
+        # batch classification: one numbered message per line
+        results = []
+        for line in user.splitlines():
+            m = re.match(r"\s*(\d+)\.\s*(.*)", line)
+            if m:
+                intent, conf, reason = classify_text(m.group(2))
+                results.append({"id": int(m.group(1)), "intent": intent, "confidence": conf, "reason": reason})
+        return json.dumps({"results": results})
+
+    if "intents" in props or '"intents"' in system:
+        intent, conf, reason = classify_text(user)
+        return json.dumps({"intents": [{"intent": intent, "confidence": conf, "reason": reason}]})
+
+    if "intent" in props or "intent" in system:
+        intent, conf, reason = classify_text(user)
+        return json.dumps({"intent": intent, "confidence": conf, "reason": reason})
+
+    if "Context:" in user and "Question:" in user:
+        context = user.split("Context:", 1)[1].split("Question:", 1)[0].strip()
+        if not context:
+            return "I don't have enough information to answer that question."
+        sentence = re.split(r"(?<=[.!?])\s", context, maxsplit=1)[0]
+        return sentence.strip()
+
+    if fmt:
+        return json.dumps({"response": user[:80]})
+    return f"Stub reply to: {user[:80]}"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "OllamaStub/1.0"
+
+    # set by main()
+    profile = PROFILES["instant"]
+    dim = 4096
+    quiet = False
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    # -------------------------
+    # plumbing
+    # -------------------------
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw or b"{}")
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _send_chunk(self, payload: dict | None):
+        data = b"" if payload is None else (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _sleep_prompt(self, prompt_tokens: int):
+        delay = self.profile["overhead"]
+        if self.profile["prompt_tps"]:
+            delay += prompt_tokens / self.profile["prompt_tps"]
+        if delay:
+            time.sleep(delay)
+
+    def _sleep_tokens(self, n: int):
+        if self.profile["gen_tps"] and n:
+            time.sleep(n / self.profile["gen_tps"])
+
+    # -------------------------
+    # routes
+    # -------------------------
+    def do_GET(self):
+        if self.path == "/api/version":
+            return self._send_json({"version": "0.0.0-stub"})
+        if self.path in ("/api/tags", "/api/ps"):
+            return self._send_json({"models": []})
+        if self.path == "/":
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            return self.wfile.write(body)
+        self._send_json({"error": "not found"}, status=404)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        try:
+            req = self._read_json()
+        except ValueError:
+            return self._send_json({"error": "invalid JSON"}, status=400)
+
+        routes = {
+            "/api/chat": self._chat,
+            "/api/generate": self._generate,
+            "/api/embeddings": self._embeddings,
+            "/api/embed": self._embed,
+        }
+        handler = routes.get(self.path)
+        if handler is None:
+            return self._send_json({"error": "not found"}, status=404)
+        try:
+            handler(req)
+        except (BrokenPipeError, ConnectionResetError):
+            # client closed the stream early (e.g. JSON cutoff)
+            self.close_connection = True
+
+    def _chat(self, req: dict):
+        messages = req.get("messages") or []
+        model = req.get("model", "")
+        if not messages:
+            # model preload
+            return self._send_json({
+                "model": model, "created_at": _now(),
+                "message": {"role": "assistant", "content": ""},
+                "done": True, "done_reason": "load",
+            })
+        self._complete(req, chat_answer(messages, req.get("format")),
+                       sum(estimate_tokens(m.get("content", "")) for m in messages), chat=True)
+
+    def _generate(self, req: dict):
+        prompt = req.get("prompt") or ""
+        answer = chat_answer([{"role": "user", "content": prompt}], req.get("format")) if prompt else ""
+        self._complete(req, answer, estimate_tokens(prompt), chat=False)
+
+    def _complete(self, req: dict, answer: str, prompt_tokens: int, chat: bool):
+        model = req.get("model", "")
+        num_predict = (req.get("options") or {}).get("num_predict")
+
+        # whitespace-preserving "tokens"
+        tokens = re.findall(r"\S+\s*|\s+", answer)
+        if num_predict is not None and num_predict >= 0:
+            tokens = tokens[:num_predict]
+
+        started = time.perf_counter()
+        self._sleep_prompt(prompt_tokens)
+
+        def part(text: str, done: bool) -> dict:
+            payload = {"model": model, "created_at": _now(), "done": done}
+            if chat:
+                payload["message"] = {"role": "assistant", "content": text}
+            else:
+                payload["response"] = text
+            if done:
+                payload.update({
+                    "done_reason": "length" if num_predict is not None and len(tokens) >= num_predict else "stop",
+                    "total_duration": int((time.perf_counter() - started) * 1e9),
+                    "prompt_eval_count": prompt_tokens,
+                    "eval_count": len(tokens),
+                })
+            return payload
+
+        if req.get("stream", True):
+            self._start_stream()
+            for tok in tokens:
+                self._sleep_tokens(1)
+                self._send_chunk(part(tok, False))
+            self._send_chunk(part("", True))
+            self._send_chunk(None)
+        else:
+            self._sleep_tokens(len(tokens))
+            self._send_json(part("".join(tokens), True))
+
+    def _embeddings(self, req: dict):
+        if self.profile["embed_latency"]:
+            time.sleep(self.profile["embed_latency"])
+        self._send_json({"embedding": embed_text(req.get("prompt") or "", self.dim)})
+
+    def _embed(self, req: dict):
+        inputs = req.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        if self.profile["embed_latency"]:
+            # batched embedding amortises the per-call cost
+            time.sleep(self.profile["embed_latency"] * (1 + 0.1 * max(0, len(inputs) - 1)))
+        self._send_json({
+            "model": req.get("model", ""),
+            "embeddings": [embed_text(text, self.dim) for text in inputs],
+        })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deterministic Ollama stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="instant")
+    parser.add_argument("--prompt-tps", type=float, help="override prompt-eval tokens/s")
+    parser.add_argument("--gen-tps", type=float, help="override generated tokens/s")
+    parser.add_argument("--embed-latency-ms", type=float, help="override embedding latency")
+    parser.add_argument("--dim", type=int, default=4096, help="embedding dimension")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    profile = dict(PROFILES[args.profile])
+    if args.prompt_tps is not None:
+        profile["prompt_tps"] = args.prompt_tps
+    if args.gen_tps is not None:
+        profile["gen_tps"] = args.gen_tps
+    if args.embed_latency_ms is not None:
+        profile["embed_latency"] = args.embed_latency_ms / 1000
+
+    StubHandler.profile = profile
+    StubHandler.dim = args.dim
+    StubHandler.quiet = args.quiet
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.daemon_threads = True
+    print(f"Ollama stub listening on http://{args.host}:{args.port} (profile={args.profile}, dim={args.dim})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
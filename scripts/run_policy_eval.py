@@ -1,7 +1,12 @@
 import requests
 import csv
+import os
 import time
 
+# Pause between requests. Set EVAL_DELAY=0 when the API runs with
+# LLM_CASSETTE_MODE=replay (no live inference to protect).
+DELAY = float(os.getenv("EVAL_DELAY", 0.5))
+
 API_URL = "http://localhost:8000/query"
 
 QUESTIONS = [
@@ -36,7 +41,8 @@ for q in QUESTIONS:
         "confidence": data.get("confidence"),
     })
 
-    time.sleep(0.5)  # be nice to your local LLM 😄
+    if DELAY:
+        time.sleep(DELAY)  # be nice to a live local LLM; 0 when the API replays a cassette
 
 # Save results
 with open("policy_eval_results.csv", "w", newline="", encoding="utf-8") as f:
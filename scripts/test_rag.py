@@ -1,20 +1,20 @@
 from pathlib import Path
 import sys
-import ollama
 
 # Ensure project root is on sys.path so `app` imports work when running the script
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT_DIR))
 
+from app.llm import embed
 from app.rag.chroma_client import get_collection
 
 # IMPORTANT: use centralized helper for collection
 collection = get_collection("policies")
 
 
-def embed_query(query, model="llama3.1"):
-    response = ollama.embeddings(model=model, prompt=query)
-    return response["embedding"]
+def embed_query(query, model=None):
+    # Same "embed" inference profile the app and ingest use
+    return embed(query, model=model)
 
 
 query = "What is the return policy?"
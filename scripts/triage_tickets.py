@@ -0,0 +1,221 @@
+"""
+Bulk triage of historical tickets.
+
+Streams a CSV or JSONL file of tickets through the intent classifier (and
+optionally the full router) on a pool of worker processes, writing one
+JSON line per ticket as results come in:
+
+    python scripts/triage_tickets.py tickets.csv -o triage.jsonl
+    python scripts/triage_tickets.py tickets.jsonl -o triage.jsonl --route --workers 8
+
+Input rows need a query column/field (--query-field, default "query") and
+may have an id (--id-field, default "id"; the row number otherwise).
+
+Tickets are sent in chunks of --chunk-size. In classify-only mode the
+local classifier settles the clear-cut tickets of a chunk and the rest go
+out as a single classify_intents_batch() call at BULK priority. At most
+--max-in-flight chunks are queued at once, so memory stays flat however
+big the input is. Results are written in input order. After each chunk,
+<output>.progress.json records the input, the mode (classify or route)
+and how many input rows are done. Rerunning the same command after a
+crash resumes from there; --restart starts over.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+# -------------------------
+# input
+# -------------------------
+def read_tickets(path: Path, id_field: str, query_field: str):
+    """Yield (id, query) pairs without loading the file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for n, row in enumerate(rows, 1):
+            yield str(row.get(id_field) or n), row.get(query_field) or ""
+
+
+def chunked(iterable, size: int):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+# -------------------------
+# worker side (app modules are imported in the workers only)
+# -------------------------
+def triage_chunk(tickets: list[tuple[str, str]], route: bool) -> list[dict]:
+    if route:
+        return [_route_one(ticket_id, query) for ticket_id, query in tickets]
+
+    from app.canonicalize import canonical_text
+    from app.config import LOCAL_CLASSIFIER_ENABLED, LOCAL_CLASSIFIER_THRESHOLD
+    from app.llm_intent_classifier import classify_intents_batch
+    from app.local_intent_classifier import classify_intent_local
+
+    # the local fast path settles the clear-cut tickets; only the rest
+    # are sent to the LLM
+    results = [None] * len(tickets)
+    if LOCAL_CLASSIFIER_ENABLED:
+        for n, (_, query) in enumerate(tickets):
+            local = classify_intent_local(canonical_text(query))
+            if local.confidence >= LOCAL_CLASSIFIER_THRESHOLD:
+                results[n] = local
+
+    unsettled = [n for n, r in enumerate(results) if r is None]
+    if unsettled:
+        try:
+            for n, r in zip(unsettled, classify_intents_batch([tickets[n][1] for n in unsettled])):
+                results[n] = r
+        except Exception as e:
+            for n in unsettled:
+                results[n] = e
+
+    rows = []
+    for (ticket_id, query), r in zip(tickets, results):
+        if isinstance(r, Exception):
+            rows.append({"id": ticket_id, "query": query, "error": repr(r)})
+        else:
+            rows.append({
+                "id": ticket_id,
+                "query": query,
+                "intent": r.intent.value,
+                "confidence": r.confidence,
+                "reason": r.reason,
+            })
+    return rows
+
+
+def _route_one(ticket_id: str, query: str) -> dict:
+    from app.router import route_query
+
+    try:
+        result = route_query(query)
+    except Exception as e:
+        return {"id": ticket_id, "query": query, "error": repr(e)}
+
+    intent = result.get("intent")
+    return {
+        "id": ticket_id,
+        "query": query,
+        "intent": intent.intent.value if intent else None,
+        "intent_confidence": intent.confidence if intent else None,
+        "decision": result.get("decision"),
+        "confidence": result.get("confidence"),
+        "escalate": result.get("escalate", False),
+        "final_answer": result.get("final_answer"),
+    }
+
+
+# -------------------------
+# checkpointing
+# -------------------------
+def load_progress(progress_path: Path, input_path: Path, mode: str) -> dict:
+    if not progress_path.exists():
+        return {"input": str(input_path), "mode": mode, "rows_done": 0, "output_bytes": 0}
+    progress = json.loads(progress_path.read_text())
+    if progress.get("input") != str(input_path):
+        sys.exit(f"{progress_path} belongs to {progress['input']}; use --restart to start over")
+    if progress.get("mode") != mode:
+        sys.exit(f"{progress_path} was written in {progress.get('mode')} mode, not {mode}; use --restart to start over")
+    return progress
+
+
+def save_progress(progress_path: Path, progress: dict):
+    tmp = progress_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(progress))
+    os.replace(tmp, progress_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk ticket triage with resumable progress")
+    parser.add_argument("input", type=Path, help="CSV or JSONL file of tickets")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="JSONL output file")
+    parser.add_argument("--route", action="store_true", help="run the full route_query pipeline, not just the classifier")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=16, help="tickets per task (one batched LLM call when classifying)")
+    parser.add_argument("--max-in-flight", type=int, default=0, help="queued chunks (default: 4 per worker)")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--query-field", default="query")
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress and overwrite the output")
+    args = parser.parse_args(argv)
+
+    progress_path = args.output.with_name(args.output.name + ".progress.json")
+    if args.restart and progress_path.exists():
+        progress_path.unlink()
+    progress = load_progress(progress_path, args.input, "route" if args.route else "classify")
+
+    # drop anything written after the last checkpoint
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    out = open(args.output, "r+b" if progress["output_bytes"] else "wb")
+    out.truncate(progress["output_bytes"])
+    out.seek(progress["output_bytes"])
+
+    if progress["rows_done"]:
+        print(f"Resuming after {progress['rows_done']} rows", file=sys.stderr)
+
+    tickets = islice(read_tickets(args.input, args.id_field, args.query_field), progress["rows_done"], None)
+    max_in_flight = args.max_in_flight or args.workers * 4
+
+    started = time.perf_counter()
+    done = 0
+    errors = 0
+    last_report = started
+
+    def _write(rows: list[dict]):
+        nonlocal done, errors, last_report
+        for row in rows:
+            out.write((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"))
+            errors += "error" in row
+        out.flush()
+        os.fsync(out.fileno())
+
+        done += len(rows)
+        progress["rows_done"] += len(rows)
+        progress["output_bytes"] = out.tell()
+        save_progress(progress_path, progress)
+
+        now = time.perf_counter()
+        if now - last_report >= 5:
+            last_report = now
+            rate = done / (now - started)
+            print(f"{progress['rows_done']} rows done ({rate:.1f}/s, {errors} errors)", file=sys.stderr)
+
+    # futures are consumed oldest-first, so output keeps input order and
+    # no more than max_in_flight chunks are ever pending
+    pending = deque()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for chunk in chunked(tickets, args.chunk_size):
+                if len(pending) >= max_in_flight:
+                    _write(pending.popleft().result())
+                pending.append(pool.submit(triage_chunk, chunk, args.route))
+            while pending:
+                _write(pending.popleft().result())
+    finally:
+        out.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Triaged {done} rows in {elapsed:.1f}s ({done / max(elapsed, 1e-9):.1f}/s, {errors} errors) -> {args.output}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+@pytest.fixture(autouse=True)
+def _repo_cwd(monkeypatch):
+    # data paths in app/config.py are relative to the repository root
+    monkeypatch.chdir(ROOT_DIR)
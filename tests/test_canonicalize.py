@@ -0,0 +1,28 @@
+from app.canonicalize import ORDER_ID_PLACEHOLDER, canonical_text, canonicalize
+
+
+def test_order_ids_are_masked_and_kept():
+    canonical = canonicalize("Where is ord-123?? And ORD_456!")
+    assert canonical.order_ids == ("ORD123", "ORD456")
+    assert canonical.order_id == "ORD123"
+    assert canonical.text == f"where is {ORDER_ID_PLACEHOLDER}? and {ORDER_ID_PLACEHOLDER}"
+
+
+def test_variants_share_one_canonical_form():
+    variants = [
+        "Where is my order ORD123?",
+        "  where is my   order ord999 ",
+        "WHERE IS MY ORDER ORD1!!!",
+        "Where​ is my order ORD42…",
+    ]
+    assert len({canonical_text(v) for v in variants}) == 1
+
+
+def test_typographic_punctuation_is_normalised():
+    assert canonical_text("I’m “angry” — really") == "i'm \"angry\" - really"
+
+
+def test_idempotent():
+    for query in ["Can I return it?", "Refund ORD123 please!!", "ｆｕｌｌ ｗｉｄｔｈ"]:
+        once = canonical_text(query)
+        assert canonical_text(once) == once
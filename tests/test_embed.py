@@ -0,0 +1,51 @@
+import pytest
+
+import app.llm as llm
+from app.embedding_cache import EmbeddingCache
+
+
+class _Client:
+    """/api/embeddings returns raw vectors, /api/embed unit ones."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embeddings(self, model, prompt, **kwargs):
+        self.calls.append("embeddings")
+        return {"embedding": [3.0, 4.0]}
+
+    def embed(self, model, input, **kwargs):
+        self.calls.append("embed")
+        return {"embeddings": [[0.6, 0.8] for _ in input]}
+
+
+class _Pool:
+    def __init__(self, client):
+        self.client = client
+
+    def call(self, fn):
+        return fn(self.client)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = _Client()
+    cache = EmbeddingCache(db_path=None)
+    monkeypatch.setattr(llm, "get_pool", lambda: _Pool(client))
+    monkeypatch.setattr(llm, "get_embedding_cache", lambda: cache)
+    monkeypatch.setattr(llm, "get_cassette", lambda: None)
+    return client
+
+
+def test_embed_returns_unit_vectors(client):
+    assert llm.embed("hello", model="m") == pytest.approx([0.6, 0.8])
+
+
+def test_embed_and_embed_batch_share_cache_entries(client):
+    single = llm.embed("hello", model="m")
+    assert llm.embed_batch(["hello"], model="m") == [single]
+    assert client.calls == ["embeddings"]
+
+    batched = llm.embed_batch(["world"], model="m")
+    assert llm.embed("world", model="m") == batched[0]
+    assert client.calls == ["embeddings", "embed"]
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import numpy as np
+
+import app.fewshot as fewshot
+from app.inference_scheduler import Priority
+
+
+def test_select_embeds_the_query_at_the_callers_priority(monkeypatch):
+    selector = fewshot.FewShotSelector(
+        "test",
+        'Input: "What is the return policy?"\nOutput: {"intent": "POLICY"}',
+        lambda label: {"intent": label},
+        k=1,
+    )
+    priorities = []
+
+    def fake_embed(text, priority=Priority.INTERACTIVE, **kwargs):
+        priorities.append(priority)
+        return [1.0, 0.0]
+
+    monkeypatch.setattr(fewshot, "embed", fake_embed)
+    selector._matrix = np.asarray([[1.0, 0.0]], dtype=np.float32)
+    monkeypatch.setattr(selector, "pool", lambda: [("What is the return policy?", '{"intent": "POLICY"}')])
+
+    assert selector.select("can I return this", priority=Priority.BULK)
+    assert selector.select("can I return this")
+    assert priorities == [Priority.BULK, Priority.INTERACTIVE]
+
+
+def test_select_falls_back_until_the_pool_is_embedded(monkeypatch):
+    selector = fewshot.FewShotSelector("test", "", lambda label: {"intent": label}, k=1)
+    embedded = []
+    building = threading.Event()
+    release = threading.Event()
+
+    def fake_matrix():
+        building.set()
+        release.wait(2)
+        selector._matrix = np.asarray([[1.0, 0.0]], dtype=np.float32)
+        return selector._matrix
+
+    monkeypatch.setattr(fewshot, "embed", lambda text, priority=None, **kwargs: embedded.append(text) or [1.0, 0.0])
+    monkeypatch.setattr(selector, "matrix", fake_matrix)
+    monkeypatch.setattr(selector, "pool", lambda: [("What is the return policy?", '{"intent": "POLICY"}')])
+
+    # cold: static examples, no query embedding, the pool builds in the background
+    assert selector.select("can I return this") is None
+    assert selector.select("can I return this") is None
+    assert building.wait(2)
+    assert embedded == []
+
+    release.set()
+    for _ in range(100):
+        if selector._matrix is not None:
+            break
+        time.sleep(0.01)
+    assert selector.select("can I return this")
+    assert len(embedded) == 1
+
+
+def test_llm_classifier_passes_its_priority_to_the_selector(monkeypatch):
+    import app.llm_intent_classifier as llm_intent_classifier
+
+    seen = {}
+
+    class FakeLLM:
+        def invoke(self, messages, priority=None, **kwargs):
+            seen["invoke"] = priority
+            return type("Resp", (), {"content": '{"intent": "POLICY", "confidence": 0.9, "reason": "test"}'})()
+
+    def fake_select(query, embed_query=None, priority=Priority.INTERACTIVE):
+        seen["select"] = priority
+        return None
+
+    monkeypatch.setattr(llm_intent_classifier, "get_llm", lambda profile: FakeLLM())
+    monkeypatch.setattr(llm_intent_classifier.FEWSHOT, "select", fake_select)
+
+    result = llm_intent_classifier.classify_intent_llm("Can I return it?", priority=Priority.BULK)
+    assert result.intent.value == "POLICY"
+    assert seen == {"select": Priority.BULK, "invoke": Priority.BULK}
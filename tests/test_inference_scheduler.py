@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from app.inference_scheduler import InferenceQueueFull, InferenceScheduler, Priority
+
+
+def _occupy(scheduler) -> threading.Event:
+    """Hold the single slot until the returned event is set."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(2)
+
+    threading.Thread(target=scheduler.run, args=(hold, Priority.GENERATION), daemon=True).start()
+    started.wait(2)
+    return release
+
+
+def _wait_for_queue(scheduler, depth):
+    deadline = time.monotonic() + 2
+    while scheduler.stats()["queue_depth"] < depth and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_waiting_calls_run_by_priority_then_fifo():
+    scheduler = InferenceScheduler(max_concurrency=1, max_queue_depth=0)
+    release = _occupy(scheduler)
+    order = []
+
+    threads = []
+    for n, priority in enumerate([Priority.BULK, Priority.GENERATION, Priority.INTERACTIVE, Priority.BULK]):
+        t = threading.Thread(target=scheduler.run, args=(lambda n=n, p=priority: order.append((p, n)), priority))
+        t.start()
+        threads.append(t)
+        _wait_for_queue(scheduler, n + 1)
+
+    release.set()
+    for t in threads:
+        t.join(2)
+
+    assert order == [
+        (Priority.INTERACTIVE, 2),
+        (Priority.GENERATION, 1),
+        (Priority.BULK, 0),
+        (Priority.BULK, 3),
+    ]
+
+
+def test_full_queue_rejects_new_calls():
+    scheduler = InferenceScheduler(max_concurrency=1, max_queue_depth=1)
+    release = _occupy(scheduler)
+    waiter = threading.Thread(target=scheduler.run, args=(lambda: None, Priority.BULK))
+    waiter.start()
+    _wait_for_queue(scheduler, 1)
+
+    with pytest.raises(InferenceQueueFull):
+        scheduler.run(lambda: None, Priority.INTERACTIVE)
+
+    release.set()
+    waiter.join(2)
+    assert scheduler.stats()["rejected"] == 1
+
+
+def test_exceptions_release_the_slot():
+    scheduler = InferenceScheduler(max_concurrency=1, max_queue_depth=0)
+    with pytest.raises(RuntimeError):
+        scheduler.run(lambda: (_ for _ in ()).throw(RuntimeError("boom")), Priority.INTERACTIVE)
+    assert scheduler.run(lambda: "ok", Priority.INTERACTIVE) == "ok"
+    assert scheduler.stats()["active"] == 0
@@ -0,0 +1,40 @@
+from app.llm import _JsonObjectEnd
+
+
+def _end(*chunks):
+    """(chunk index, offset) where the object closes, or None."""
+    scanner = _JsonObjectEnd()
+    for n, chunk in enumerate(chunks):
+        end = scanner.feed(chunk)
+        if end is not None:
+            return n, end
+    return None
+
+
+def test_braces_inside_strings_are_ignored():
+    text = '{"reason": "use } or {"} trailing'
+    assert _end(text) == (0, text.index("}", text.index('"}')) + 1)
+
+
+def test_escaped_quotes_do_not_end_a_string():
+    text = r'{"reason": "said \"}\" twice"} trailing'
+    assert _end(text) == (0, text.rindex("}") + 1)
+
+
+def test_text_before_the_object_is_skipped():
+    text = 'Here is "{" the JSON: {"intent": "REFUND"} done'
+    assert _end(text) == (0, text.index(" done"))
+
+
+def test_an_unclosed_quote_before_the_object_ends_at_the_line():
+    text = 'He said "hi\n{"intent": "REFUND"}'
+    assert _end(text) == (0, len(text))
+
+
+def test_the_object_may_close_in_a_later_chunk():
+    assert _end('{"intent": "RE', 'FUND", "x": {}', '} more') == (2, 1)
+
+
+def test_a_response_that_never_closes_the_object():
+    assert _end('{"intent": "REFUND", "reason": "cut off') is None
+    assert _end("no json here") is None
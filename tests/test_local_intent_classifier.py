@@ -0,0 +1,65 @@
+import csv
+import json
+
+import pytest
+
+from app.canonicalize import canonical_text
+from app.config import INTENT_EXAMPLES_PATH, LOCAL_CLASSIFIER_THRESHOLD
+from app.intent_schema import IntentLabel, IntentResult
+from app.local_intent_classifier import MODEL_ONLY_MAX_CONFIDENCE, classify_intent_local
+
+
+# queries the naive Bayes model used to answer confidently and wrongly
+MISROUTES = [
+    "Where is my refund?",
+    "what is the status of my refund",
+    "Can I cancel my order?",
+]
+
+
+def test_model_only_cap_is_below_the_gate():
+    assert MODEL_ONLY_MAX_CONFIDENCE < LOCAL_CLASSIFIER_THRESHOLD
+
+
+@pytest.mark.parametrize("query", MISROUTES)
+def test_model_only_answers_do_not_clear_the_gate(query):
+    result = classify_intent_local(canonical_text(query))
+    assert result.confidence < LOCAL_CLASSIFIER_THRESHOLD
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("Where is my order ORD123?", IntentLabel.ORDER_STATUS),
+    ("Please refund my order ORD001", IntentLabel.REFUND),
+    ("What is the return policy?", IntentLabel.POLICY),
+    ("Hello", IntentLabel.OTHER),
+])
+def test_rule_backed_answers_clear_the_gate(query, intent):
+    result = classify_intent_local(canonical_text(query))
+    assert result.intent == intent
+    assert result.confidence >= LOCAL_CLASSIFIER_THRESHOLD
+
+
+@pytest.mark.parametrize("query", MISROUTES)
+def test_cascade_sends_misroutes_to_the_llm(monkeypatch, query):
+    import app.intent_classifier as intent_classifier
+
+    llm_result = IntentResult(intent=IntentLabel.OTHER, confidence=0.5, reason="llm")
+    calls = []
+
+    def fake_llm(q, embed_query=None, priority=None):
+        calls.append(q)
+        return llm_result
+
+    monkeypatch.setattr(intent_classifier, "INTENT_CLASSIFIER_BACKEND", "llm")
+    monkeypatch.setattr(intent_classifier, "classify_intent_llm", fake_llm)
+
+    assert intent_classifier.classify_intent(query) is llm_result
+    assert calls == [canonical_text(query)]
+
+
+def test_training_examples_exclude_evaluation_questions():
+    with open("evaluation/questions.csv", newline="", encoding="utf-8") as f:
+        eval_queries = {row["query"].strip().lower() for row in csv.DictReader(f)}
+    with open(INTENT_EXAMPLES_PATH, encoding="utf-8") as f:
+        train_queries = {json.loads(line)["query"].strip().lower() for line in f if line.strip()}
+    assert not eval_queries & train_queries
@@ -0,0 +1,48 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.micro_batcher import MicroBatcher
+
+
+def test_concurrent_items_are_batched_and_answered_in_order():
+    batches = []
+
+    def process(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, max_batch=8, max_wait_ms=50, name="test-batcher")
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        results = list(pool.map(batcher.submit, range(20)))
+
+    assert results == [n * 2 for n in range(20)]
+    assert all(len(b) <= 8 for b in batches)
+    assert len(batches) < 20
+    stats = batcher.stats()
+    assert stats["items"] == 20
+    assert stats["max_batch"] <= 8
+
+
+def test_a_failed_batch_fails_every_caller():
+    batcher = MicroBatcher(lambda items: 1 / 0, max_wait_ms=20, name="test-failing")
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(batcher.submit, n) for n in range(3)]
+        for f in futures:
+            with pytest.raises(ZeroDivisionError):
+                f.result()
+
+
+def test_wrong_result_count_is_an_error():
+    batcher = MicroBatcher(lambda items: [], max_wait_ms=1, name="test-short")
+    with pytest.raises(RuntimeError):
+        batcher.submit("x")
+
+
+def test_batches_still_run_after_the_executor_shuts_down():
+    # at interpreter exit concurrent.futures refuses new work; a caller
+    # already waiting must still get its answer
+    batcher = MicroBatcher(lambda items: [item * 2 for item in items], max_wait_ms=1, name="test-shutdown")
+    batcher._executor.shutdown()
+    assert batcher.submit(3) == 6
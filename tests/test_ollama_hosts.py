@@ -0,0 +1,100 @@
+import threading
+import time
+
+import httpx
+import ollama
+import pytest
+
+from app.ollama_hosts import HostPool
+
+
+@pytest.fixture
+def pool():
+    pool = HostPool(["http://primary.test:11434", "http://backup.test:11434"], health_interval=0, hedge_after=0.05)
+    yield pool
+    pool.close()
+
+
+def _host_name(pool, client) -> str:
+    return "primary" if client is pool.hosts[0].client else "backup"
+
+
+def test_fast_answer_is_not_hedged(pool):
+    assert pool.call(lambda client: "ok") == "ok"
+    assert pool.stats()["hedged"] == 0
+
+
+def test_request_error_is_raised_without_hedging(pool):
+    calls = []
+
+    def fn(client):
+        calls.append(_host_name(pool, client))
+        raise ollama.ResponseError("model not found", 404)
+
+    with pytest.raises(ollama.ResponseError):
+        pool.call(fn)
+    assert calls == ["primary"]
+    assert pool.stats()["hedged"] == 0
+
+
+def test_host_error_fails_over_without_counting_a_hedge(pool):
+    def fn(client):
+        if _host_name(pool, client) == "primary":
+            raise httpx.ConnectError("refused")
+        return "from backup"
+
+    assert pool.call(fn) == "from backup"
+    stats = pool.stats()
+    assert stats["hedged"] == 0
+    assert stats["hosts"][0]["healthy"] is False
+
+
+def test_slow_primary_is_hedged_and_backup_wins(pool):
+    release = threading.Event()
+
+    def fn(client):
+        if _host_name(pool, client) == "primary":
+            release.wait(2)
+            return "from primary"
+        return "from backup"
+
+    try:
+        started = time.perf_counter()
+        assert pool.call(fn) == "from backup"
+        assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+    stats = pool.stats()
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_hedges_are_capped_until_the_slower_request_finishes():
+    pool = HostPool(["http://primary.test:11434", "http://backup.test:11434"],
+                    health_interval=0, hedge_after=0.05, max_hedges=1)
+    release = threading.Event()
+
+    def fn(client):
+        if _host_name(pool, client) == "primary":
+            release.wait(2)
+            return "from primary"
+        return "from backup"
+
+    try:
+        # the first call is hedged; its primary request keeps the slot
+        assert pool.call(fn) == "from backup"
+        assert pool.stats()["hedges_in_flight"] == 1
+
+        # no slot left: a second slow call waits for its own request
+        second = threading.Thread(target=pool.call, args=(lambda client: release.wait(2),))
+        second.start()
+        time.sleep(0.2)
+        assert pool.stats()["hedges_skipped"] == 1
+    finally:
+        release.set()
+    second.join(2)
+
+    stats = pool.stats()
+    assert stats["hedged"] == 1
+    assert stats["hedges_in_flight"] == 0
+    pool.close()
@@ -0,0 +1,46 @@
+import random
+
+from app.phrase_matcher import PhraseMatcher
+
+
+def test_matches_like_substring_checks():
+    phrases = ["he", "she", "his", "hers", "refund my", "money back"]
+    matcher = PhraseMatcher(phrases)
+    rng = random.Random(0)
+    alphabet = "hersiy mondcbakfu"
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        expected = {p for p in phrases if p in text}
+        assert {m.phrase for m in matcher.iter_matches(text)} == expected
+        assert matcher.search(text) == bool(expected)
+
+
+def test_case_insensitive_with_positions():
+    matcher = PhraseMatcher(["money back"])
+    (match,) = matcher.find_all("I want my MONEY BACK now")
+    assert (match.start, match.end) == (10, 20)
+
+
+def test_first_label_follows_group_order():
+    matcher = PhraseMatcher({
+        "damage": ["damaged"],
+        "refund": ["refund"],
+    })
+    text = "refund for a damaged item"
+    assert matcher.labels(text) == {"damage", "refund"}
+    assert matcher.first_label(text) == "damage"
+    assert matcher.first_label("hello", default="none") == "none"
+
+
+def test_startswith_only_matches_prefixes():
+    matcher = PhraseMatcher(["can i", "what is"])
+    assert matcher.startswith("can i return it")
+    assert not matcher.startswith("so can i return it")
+    # "bc" is reached through a fail link from "abc", but starts at index 1
+    matcher = PhraseMatcher(["abc", "bc"])
+    assert matcher.startswith("abcd")
+    assert not matcher.startswith("xbcd")
+
+
+def test_len_counts_distinct_phrases():
+    assert len(PhraseMatcher(["a", "b", "a", ""])) == 2
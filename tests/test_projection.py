@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from app.rag.projection import Projection, get_projection, recall_at_k
+
+
+def _unit(m):
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+
+def test_pca_is_lossless_when_the_corpus_fits_in_the_kept_dimensions():
+    rng = np.random.default_rng(0)
+    docs = _unit(rng.normal(size=(40, 128)))
+    queries = _unit(rng.normal(size=(10, 128)))
+
+    projection = Projection.fit(docs, 64)
+    assert projection.dim == 40
+    assert recall_at_k(docs, queries, projection) == {"recall@1": 1.0, "recall@5": 1.0, "recall@10": 1.0}
+
+
+def test_apply_returns_unit_vectors_of_the_reduced_dimension():
+    rng = np.random.default_rng(1)
+    docs = _unit(rng.normal(size=(200, 64)))
+    for method in ("pca", "truncate"):
+        reduced = Projection.fit(docs, 16, method=method).apply(docs)
+        assert reduced.shape == (200, 16)
+        assert np.allclose(np.linalg.norm(reduced, axis=1), 1.0)
+
+
+def test_invalid_settings_are_rejected():
+    docs = np.eye(8, dtype=np.float32)
+    with pytest.raises(ValueError):
+        Projection.fit(docs, 8)
+    with pytest.raises(ValueError):
+        Projection.fit(docs, 4, method="random")
+    with pytest.raises(ValueError):
+        Projection.fit(docs, 4).apply(np.ones((1, 6)))
+
+
+def test_saved_projection_round_trips_and_reloads_on_change(tmp_path):
+    rng = np.random.default_rng(2)
+    docs = _unit(rng.normal(size=(100, 32)))
+    path = tmp_path / "policies.projection.npz"
+    assert get_projection(path) is None
+
+    pca = Projection.fit(docs, 8)
+    pca.save(path)
+    loaded = get_projection(path)
+    assert loaded.method == "pca"
+    assert np.allclose(loaded.apply(docs), pca.apply(docs), atol=1e-6)
+
+    Projection.fit(docs, 4, method="truncate").save(path)
+    assert get_projection(path).dim == 4
+    assert not list(tmp_path.glob("*.tmp*"))
@@ -0,0 +1,33 @@
+from app.sentiment import score_sentiment
+
+
+def test_negation_reaches_a_few_words_back():
+    result = score_sentiment("I am not at all angry")
+    assert result.label == "neutral"
+    assert result.score == 0.0
+
+
+def test_negation_stops_at_the_clause():
+    result = score_sentiment("I'm not angry, but this is ridiculous")
+    assert result.cues == ("ridiculous",)
+
+
+def test_a_longer_phrase_is_not_counted_again_through_its_parts():
+    assert score_sentiment("worst service ever").cues == ("worst service",)
+    assert score_sentiment("worst service ever").score == score_sentiment("this is unacceptable").score
+
+
+def test_a_repeated_phrase_counts_once():
+    assert score_sentiment("terrible terrible terrible").score == score_sentiment("terrible").score
+
+
+def test_short_acronyms_are_not_shouting():
+    assert score_sentiment("Is the FAQ valid in the USA?").label == "neutral"
+    assert "shouting" in score_sentiment("WHERE IS MY ORDER").cues
+    assert "shouting" in score_sentiment("I WANT MY MONEY NOW").cues
+
+
+def test_strong_cues_escalate():
+    result = score_sentiment("This is a scam!! I'm furious")
+    assert result.label == "angry"
+    assert result.escalate
@@ -0,0 +1,59 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def _wait_for_followers(flight, n):
+    deadline = time.monotonic() + 2
+    while flight.coalesced < n and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_for_one_key_run_once():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(2)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(flight.do, "key", fn) for _ in range(5)]
+        # every follower is waiting on the leader before it finishes
+        _wait_for_followers(flight, 4)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_followers_get_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait(2)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flight.do, "key", fn) for _ in range(3)]
+        _wait_for_followers(flight, 2)
+        release.set()
+        for f in futures:
+            with pytest.raises(ValueError):
+                f.result()
+
+
+def test_nothing_is_kept_after_the_call():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+    assert flight.stats()["executed"] == 2
@@ -0,0 +1,135 @@
+import time
+
+import pytest
+
+import app.sqlite_lru as sqlite_lru
+from app.embedding_cache import EmbeddingCache, make_embedding_key
+from app.llm_cache import LLMCache
+
+# each cache with a value factory that round-trips through its codec
+CACHES = [
+    pytest.param((lambda path, **kw: LLMCache(db_path=path, ttl=0, **kw), lambda i: f"value {i}"), id="llm"),
+    pytest.param((lambda path, **kw: EmbeddingCache(db_path=path, **kw), lambda i: [float(i), 0.5]), id="embedding"),
+]
+
+
+@pytest.fixture(params=CACHES)
+def make(request, tmp_path):
+    factory, value = request.param
+
+    def make(**kwargs):
+        kwargs.setdefault("max_entries", 100)
+        kwargs.setdefault("memory_entries", 0)
+        path = kwargs.pop("db_path", str(tmp_path / "cache.db"))
+        return factory(path, **kwargs)
+
+    make.value = value
+    return make
+
+
+def _statements(cache) -> list[str]:
+    seen = []
+    cache._conn.set_trace_callback(seen.append)
+    return seen
+
+
+def test_round_trip_survives_a_new_instance(make):
+    cache = make()
+    cache.set("k", make.value(1))
+    assert cache.get("k") == make.value(1)
+    assert make().get("k") == make.value(1)
+    assert cache.get("missing") is None
+
+
+def test_memory_hits_return_a_fresh_value(make):
+    cache = make(memory_entries=4)
+    cache.set("k", make.value(1))
+    first = cache.get("k")
+    assert cache.get("k") == first
+    assert cache.stats()["memory_hits"] == 2
+
+
+def test_memory_only_cache(make):
+    cache = make(db_path=None, memory_entries=2)
+    for i in range(3):
+        cache.set(f"k{i}", make.value(i))
+    assert cache.get("k0") is None
+    assert cache.get("k2") == make.value(2)
+    assert cache.stats()["persistent"] is False
+
+
+def test_set_does_not_count_rows_below_the_limit(make):
+    cache = make()
+    statements = _statements(cache)
+    for i in range(50):
+        cache.set(f"k{i}", make.value(i))
+    assert not [s for s in statements if "COUNT(*)" in s]
+
+
+def test_disk_hits_update_recency_in_batches(make, monkeypatch):
+    monkeypatch.setattr(sqlite_lru, "TOUCH_BATCH", 10)
+    cache = make()
+    for i in range(10):
+        cache.set(f"k{i}", make.value(i))
+
+    statements = _statements(cache)
+    for i in range(9):
+        assert cache.get(f"k{i}") == make.value(i)
+    assert not [s for s in statements if s.startswith("UPDATE")]
+
+    cache.get("k9")
+    assert len([s for s in statements if s.startswith("UPDATE")]) == 10
+
+
+def test_eviction_keeps_the_limit_and_drops_least_recently_used(make):
+    cache = make(max_entries=5)
+    for i in range(5):
+        cache.set(f"k{i}", make.value(i))
+    # k0 is used again, so k1 is now the oldest
+    assert cache.get("k0") == make.value(0)
+    cache.set("k5", make.value(5))
+
+    (count,) = cache._conn.execute(f"SELECT COUNT(*) FROM {cache.table}").fetchone()
+    assert count == 5
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("k1") is None
+    assert cache.get("k0") == make.value(0)
+
+
+def test_overwriting_a_key_does_not_grow_the_count(make):
+    cache = make(max_entries=3)
+    for i in range(5):
+        cache.set("same", make.value(i))
+    assert cache._rows == 1
+    assert cache.get("same") == make.value(4)
+    assert cache.stats()["evictions"] == 0
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = LLMCache(db_path=str(tmp_path / "cache.db"), ttl=0.05, memory_entries=4)
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache._rows == 0
+
+
+def test_a_table_from_an_older_layout_is_replaced(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE embedding_cache (key TEXT PRIMARY KEY, vector BLOB, last_used REAL)")
+    conn.execute("INSERT INTO embedding_cache VALUES ('k', x'00', 0)")
+    conn.commit()
+    conn.close()
+
+    cache = EmbeddingCache(db_path=path)
+    assert cache.get("k") is None
+    cache.set("k", [1.0])
+    assert cache.get("k") == [1.0]
+
+
+def test_embedding_key_normalises_whitespace_and_unicode():
+    assert make_embedding_key("m", "  return\tpolicy ") == make_embedding_key("m", "return policy")
+    assert make_embedding_key("m", "ｒｅｔｕｒｎ") == make_embedding_key("m", "return")
+    assert make_embedding_key("m", "return") != make_embedding_key("other", "return")
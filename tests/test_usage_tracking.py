@@ -0,0 +1,40 @@
+import app.intent_strategies as intent_strategies
+import app.rag.rag_answer as rag_answer
+from app.inference_scheduler import Priority
+from app.intent_schema import IntentLabel, IntentResult
+from app.llm import track_usage
+from app.micro_batcher import MicroBatcher
+
+
+def test_batched_query_embeddings_count_for_the_caller(monkeypatch):
+    batcher = MicroBatcher(lambda texts: [[1.0, 0.0] for _ in texts], max_wait_ms=5, name="test-embed")
+    monkeypatch.setattr(rag_answer, "_EMBED_BATCHER", batcher)
+    with track_usage() as usage:
+        assert rag_answer.embed_query_text("refund policy") == [1.0, 0.0]
+    assert usage["embed_calls"] == 1
+
+
+def test_shadow_runs_embed_at_bulk_priority(monkeypatch):
+    priorities = []
+
+    def embed(text, priority):
+        priorities.append(priority)
+        return [1.0]
+
+    def strategy(query, embed_query, priority):
+        embed_query()
+        return IntentResult(intent=IntentLabel.POLICY, confidence=0.5, reason="test")
+
+    def router_embedding():
+        raise AssertionError("shadow runs must not use the caller's RETRIEVAL embedding")
+
+    monkeypatch.setattr(intent_strategies, "embed", embed)
+    monkeypatch.setattr(intent_strategies, "trace_event", lambda **kwargs: None)
+    monkeypatch.setattr(intent_strategies, "_shadow_pending", 1)
+    monkeypatch.setitem(intent_strategies.STRATEGIES, "test-shadow", strategy)
+
+    intent_strategies._shadow("test-shadow", "refund policy", router_embedding, {"intent": "POLICY"}, "t")
+
+    assert priorities == [Priority.BULK]
+    assert intent_strategies._STATS["test-shadow"]["errors"] == 0
+    assert intent_strategies._STATS["test-shadow"]["agreed"] == 1
@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+from app.rag.vector_store import NumpyCollection, NumpyVectorClient
+
+
+def _vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def _add(collection, vectors, start=0):
+    n = len(vectors)
+    collection.add(
+        ids=[f"doc_{start + i}" for i in range(n)],
+        embeddings=vectors.tolist(),
+        documents=[f"text {start + i}" for i in range(n)],
+        metadatas=[{"topic": "refund" if (start + i) % 2 else "return", "n": start + i} for i in range(n)],
+    )
+
+
+def test_empty_store(tmp_path):
+    collection = NumpyCollection("policies", tmp_path / "policies")
+    assert collection.count() == 0
+    assert collection.peek() == {"ids": [], "embeddings": [], "documents": [], "metadatas": []}
+
+    result = collection.query(query_embeddings=_vectors(2).tolist(), n_results=3)
+    assert result["ids"] == [[], []]
+    assert result["documents"] == [[], []]
+
+
+def test_add_query_peek_count_round_trip(tmp_path):
+    collection = NumpyCollection("policies", tmp_path / "policies")
+    vectors = _vectors(50)
+    _add(collection, vectors)
+
+    assert collection.count() == 50
+
+    peek = collection.peek(limit=3)
+    assert peek["ids"] == ["doc_0", "doc_1", "doc_2"]
+    assert peek["documents"] == ["text 0", "text 1", "text 2"]
+    assert peek["metadatas"][1] == {"topic": "refund", "n": 1}
+
+    # each stored vector is its own nearest neighbour
+    result = collection.query(query_embeddings=vectors[[7, 21]].tolist(), n_results=4)
+    assert [ids[0] for ids in result["ids"]] == ["doc_7", "doc_21"]
+    assert [docs[0] for docs in result["documents"]] == ["text 7", "text 21"]
+    assert all(len(ids) == 4 for ids in result["ids"])
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+    assert result["distances"][0] == sorted(result["distances"][0])
+
+
+def test_query_matches_brute_force(tmp_path):
+    collection = NumpyCollection("policies", tmp_path / "policies")
+    vectors = _vectors(300, seed=1)
+    _add(collection, vectors)
+    queries = _vectors(5, seed=2)
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(queries @ unit.T), axis=1)[:, :10]
+
+    result = collection.query(query_embeddings=queries.tolist(), n_results=10)
+    assert result["ids"] == [[f"doc_{i}" for i in row] for row in expected]
+
+
+def test_existing_ids_are_skipped(tmp_path):
+    collection = NumpyCollection("policies", tmp_path / "policies")
+    _add(collection, _vectors(10))
+    _add(collection, _vectors(10, seed=5))
+    assert collection.count() == 10
+    _add(collection, _vectors(5, seed=6), start=10)
+    assert collection.count() == 15
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    collection = NumpyCollection("policies", tmp_path / "policies")
+    _add(collection, _vectors(4, dim=16))
+    with pytest.raises(ValueError):
+        _add(collection, _vectors(4, dim=8), start=4)
+
+
+def test_where_filters_on_metadata_equality(tmp_path):
+    collection = NumpyCollection("policies", tmp_path / "policies")
+    vectors = _vectors(40)
+    _add(collection, vectors)
+
+    result = collection.query(query_embeddings=vectors[[4]].tolist(), n_results=5, where={"topic": "refund"})
+    assert len(result["ids"][0]) == 5
+    assert all(m["topic"] == "refund" for m in result["metadatas"][0])
+    assert "doc_4" not in result["ids"][0]
+
+    result = collection.query(
+        query_embeddings=vectors[[3]].tolist(),
+        n_results=5,
+        where={"$and": [{"topic": {"$eq": "refund"}}, {"n": 3}]},
+    )
+    assert result["ids"] == [["doc_3"]]
+
+    result = collection.query(query_embeddings=vectors[[3]].tolist(), n_results=5, where={"topic": "damage"})
+    assert result["ids"] == [[]]
+
+    with pytest.raises(ValueError):
+        collection.query(query_embeddings=vectors[[3]].tolist(), where={"n": {"$gt": 3}})
+
+
+def test_other_instances_see_new_rows(tmp_path):
+    writer = NumpyVectorClient(tmp_path).get_or_create_collection("policies")
+    reader = NumpyVectorClient(tmp_path).get_or_create_collection("policies")
+    assert reader.count() == 0
+
+    vectors = _vectors(8)
+    _add(writer, vectors)
+    assert reader.count() == 8
+    assert reader.query(query_embeddings=vectors[[2]].tolist(), n_results=1)["ids"] == [["doc_2"]]
+
+
+@pytest.mark.parametrize("quantization", ["int8", "float16"])
+def test_quantized_scan_matches_exact_search(tmp_path, quantization):
+    vectors = _vectors(2000, dim=64, seed=3)
+    queries = _vectors(20, dim=64, seed=4)
+    exact = NumpyCollection("policies", tmp_path / "policies")
+    _add(exact, vectors)
+
+    quantized = NumpyCollection("policies", tmp_path / "policies", quantization=quantization, rescore_factor=4)
+    expected = exact.query(query_embeddings=queries.tolist(), n_results=10)
+    result = quantized.query(query_embeddings=queries.tolist(), n_results=10)
+
+    assert result["ids"] == expected["ids"]
+    assert np.allclose(result["distances"], expected["distances"], atol=1e-5)
+
+
+def test_concurrent_rebuilds_of_the_quantized_copy(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    vectors = _vectors(3000, dim=32, seed=7)
+    _add(NumpyCollection("policies", tmp_path / "policies"), vectors)
+
+    # every instance finds the int8 copy missing and rebuilds it at once
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        collections = list(pool.map(
+            lambda _: NumpyCollection("policies", tmp_path / "policies", quantization="int8"),
+            range(6),
+        ))
+
+    assert not list((tmp_path / "policies").glob("*.tmp"))
+    for collection in collections:
+        result = collection.query(query_embeddings=vectors[[11]].tolist(), n_results=1)
+        assert result["ids"] == [["doc_11"]]
@@ -0,0 +1,33 @@
+import pytest
+
+import app.warmup as warmup
+from app.ollama_hosts import HostPool
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = HostPool(["http://live.test:11434", "http://dead.test:11434"], health_interval=0, hedge_after=0)
+    monkeypatch.setattr(warmup, "get_pool", lambda: pool)
+    yield pool
+    pool.close()
+
+
+def _preload_fails_on(*urls):
+    def preload(host):
+        if host.url in urls:
+            raise ConnectionError("refused")
+    return preload
+
+
+def test_a_dead_host_does_not_block_warmup(monkeypatch, pool):
+    monkeypatch.setattr(warmup, "_preload_host", _preload_fails_on("http://dead.test:11434"))
+    assert warmup.preload_models() == 1
+    live, dead = pool.hosts
+    assert live.healthy
+    assert not dead.healthy
+
+
+def test_warmup_fails_when_no_host_can_be_preloaded(monkeypatch, pool):
+    monkeypatch.setattr(warmup, "_preload_host", _preload_fails_on(*(h.url for h in pool.hosts)))
+    with pytest.raises(RuntimeError):
+        warmup.preload_models()
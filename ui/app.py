@@ -12,6 +12,8 @@ import time
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT_DIR))
 
+from app.phrase_matcher import PhraseMatcher
+
 # -------------------------------
 # Backend API URL
 # -------------------------------
@@ -47,24 +49,21 @@ def normalize_intent(intent):
 
     return None
 
+# Intent colors, first matching group wins
+INTENT_COLORS = PhraseMatcher({
+    "#dc3545": ["refund", "return", "cancel"],  # Red
+    "#17a2b8": ["shipping", "delivery", "track"],  # Teal
+    "#28a745": ["product", "item", "stock"],  # Green
+    "#6f42c1": ["account", "login", "password"],  # Purple
+    "#fd7e14": ["pricing", "price", "discount"],  # Orange
+})
+
 def get_intent_color(intent_label):
     """Return color based on intent type"""
     if not intent_label:
         return "#6c757d"
-    
-    intent_lower = intent_label.lower()
-    if any(word in intent_lower for word in ["refund", "return", "cancel"]):
-        return "#dc3545"  # Red
-    elif any(word in intent_lower for word in ["shipping", "delivery", "track"]):
-        return "#17a2b8"  # Teal
-    elif any(word in intent_lower for word in ["product", "item", "stock"]):
-        return "#28a745"  # Green
-    elif any(word in intent_lower for word in ["account", "login", "password"]):
-        return "#6f42c1"  # Purple
-    elif any(word in intent_lower for word in ["pricing", "price", "discount"]):
-        return "#fd7e14"  # Orange
-    else:
-        return "#007bff"  # Blue
+
+    return INTENT_COLORS.first_label(intent_label, default="#007bff")  # Blue
 
 # -------------------------------
 # Page Config & Custom CSS